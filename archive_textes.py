@@ -0,0 +1,119 @@
+# Lecture d'archives de relevés déjà convertis en texte par la scolarité :
+# - un fichier texte (.txt) où les relevés se suivent, chacun précédé d'une
+#   ligne d'en-tête "@@ Releve NOM;PRENOM"
+# - une archive tar non compressée (.tar) d'un fichier texte par étudiant,
+#   commençant par la même ligne d'en-tête (sinon le nom et le prénom sont
+#   lus dans le nom du fichier, comme pour les PDF)
+# L'archive est projetée en mémoire (mmap) et découpée par relevé sans copie ;
+# seul le texte d'un relevé est décodé, le temps d'en extraire les notes.
+# Exemple: python calcul_moyenne_batch.py promotion.txt -o resultats.csv
+import os
+import re
+import mmap
+import tarfile
+from moteur_calcul import ExtracteurNotes, extraire_nom_prenom
+from instrumentation import SANS_MESURE
+
+EXTENSIONS = ('.txt', '.tar', '.tar.gz', '.tgz')
+ENTETE = re.compile(rb'@@ Releve ([^;\r\n]*);([^\r\n]*)\r?\n')
+_BLANC = re.compile(rb'\s*')
+
+
+class ErreurArchive(Exception):
+    pass
+
+
+def est_archive(chemin):
+    return chemin.lower().endswith(EXTENSIONS) and os.path.isfile(chemin)
+
+
+def entete_releve(nom, prenom):
+    # Ligne qui ouvre un relevé dans une archive
+    return f"@@ Releve {nom};{prenom}\n"
+
+
+def _vide(donnees, debut, fin):
+    return _BLANC.match(donnees, debut, fin).end() == fin
+
+
+def _decouper(donnees, debut, fin, identite=None):
+    # (identité, début, fin) de chaque relevé de donnees[debut:fin] ; le texte
+    # avant le premier en-tête est attribué à identite (None : rien à lire)
+    releves = []
+    position = debut
+    for m in ENTETE.finditer(donnees, debut, fin):
+        # Un en-tête n'est reconnu qu'en début de ligne
+        if m.start() > debut and donnees[m.start() - 1] != 0x0A:
+            continue
+        if identite is not None or not _vide(donnees, position, m.start()):
+            releves.append((identite, position, m.start()))
+        identite = {'nom': m.group(1).decode('utf-8', errors='replace').strip(),
+                    'prenom': m.group(2).decode('utf-8', errors='replace').strip()}
+        position = m.end()
+    if identite is not None:
+        releves.append((identite, position, fin))
+    elif not _vide(donnees, position, fin):
+        releves.append((None, position, fin))
+    return releves
+
+
+def _segments(donnees, chemin):
+    # (source, identité, début, fin) de chaque relevé de l'archive
+    if chemin.lower().endswith('.txt'):
+        return [(f"{chemin}#{n}", identite, debut, fin)
+                for n, (identite, debut, fin) in enumerate(_decouper(donnees, 0, len(donnees)), 1)]
+    try:
+        # Seuls les en-têtes tar sont lus ici, les données restent dans le mmap
+        with tarfile.open(chemin, 'r:') as archive:
+            membres = [m for m in archive.getmembers() if m.isfile()]
+    except tarfile.TarError as e:
+        raise ErreurArchive(f"{chemin} : archive tar illisible ou compressée "
+                            f"(la décompresser d'abord) : {e}") from e
+    segments = []
+    for membre in membres:
+        debut = membre.offset_data
+        identite_fichier = extraire_nom_prenom(os.path.splitext(membre.name)[0])
+        releves = [(identite, debut_i, fin_i) for identite, debut_i, fin_i
+                   in _decouper(donnees, debut, debut + membre.size, identite_fichier)
+                   if identite is not identite_fichier or not _vide(donnees, debut_i, fin_i)]
+        for n, (identite, debut_i, fin_i) in enumerate(releves, 1):
+            segments.append((f"{chemin}:{membre.name}" + (f"#{n}" if len(releves) > 1 else ""),
+                             identite, debut_i, fin_i))
+    return segments
+
+
+def lire_archive(chemin, mesures=SANS_MESURE):
+    # Notes de chaque relevé d'une archive, retourne (releves, erreurs)
+    # releves: triplets (source, {'nom', 'prenom'}, notes) dans l'ordre de l'archive
+    # erreurs: couples (source, message), comme pour extraire_lot
+    try:
+        with open(chemin, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise ErreurArchive(f"{chemin} : archive vide")
+            donnees = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except OSError as e:
+        raise ErreurArchive(f"Archive illisible : {e}") from e
+
+    releves, erreurs = [], []
+    # Les vues doivent être libérées avant de fermer le mmap
+    with donnees, memoryview(donnees) as vue:
+        segments = _segments(donnees, chemin)
+        if not segments:
+            raise ErreurArchive(f"{chemin} : aucun relevé trouvé")
+        for source, identite, debut, fin in segments:
+            if identite is None:
+                erreurs.append((source, "Texte sans en-tête \"@@ Releve NOM;PRENOM\""))
+                continue
+            with vue[debut:fin] as tranche, mesures.etape('extraction_notes'):
+                try:
+                    texte = str(tranche, 'utf-8')
+                except UnicodeDecodeError as e:
+                    erreurs.append((source, f"Texte non UTF-8 : {e}"))
+                    continue
+                extracteur = ExtracteurNotes()
+                extracteur.ajouter(texte)
+                notes = extracteur.resultat()
+            mesures.compter('notes', sum(len(n) for n in notes.values()))
+            releves.append((source, identite, notes))
+    mesures.compter('releves_archive', len(releves))
+    return releves, erreurs
@@ -0,0 +1,69 @@
+# Temps de démarrage à froid : import des modules de l'interface (sans ouvrir
+# de fenêtre) dans un nouvel interpréteur, comme python -X importtime
+# Affiche la médiane sur plusieurs lancements et les imports les plus coûteux ;
+# le code de retour est 1 si la médiane dépasse le budget
+# Exemple: python benchmarks/bench_demarrage.py --budget-ms 250
+import os
+import sys
+import argparse
+import subprocess
+import statistics
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def mesurer_import(module):
+    # Retourne (durée totale en µs, {import fait par module: durée cumulée en µs},
+    # modules lourds chargés)
+    code = (f"import sys; import {module}; "
+            f"print(','.join(m for m in ('pandas', 'PyPDF2', 'pyarrow') if m in sys.modules))")
+    sortie = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=RACINE,
+                            capture_output=True, text=True, check=True)
+    total, cumuls = 0, {}
+    for ligne in sortie.stderr.splitlines():
+        if not ligne.startswith('import time:') or 'cumulative' in ligne:
+            continue
+        _, cumul, nom = ligne[len('import time:'):].split('|')
+        # Deux espaces d'indentation par niveau : les imports de premier niveau
+        # s'additionnent, ceux du niveau suivant détaillent le module mesuré
+        profondeur = (len(nom) - len(nom.lstrip()) - 1) // 2
+        if profondeur == 0:
+            total += int(cumul)
+        elif profondeur == 1:
+            cumuls[nom.strip()] = int(cumul)
+    charges = [m for m in sortie.stdout.strip().split(',') if m]
+    return total, cumuls, charges
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark du temps de démarrage de l'interface.")
+    parser.add_argument('--module', default='calcul_moyenne', help="Module importé (%(default)s)")
+    parser.add_argument('-n', '--repetitions', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=250.0,
+                        help="Médiane maximale acceptée (par défaut %(default)s ms)")
+    parser.add_argument('--detail', type=int, default=10,
+                        help="Nombre d'imports du module affichés")
+    args = parser.parse_args(argv)
+
+    mesures = [mesurer_import(args.module) for _ in range(args.repetitions)]
+    totaux = [total for total, _, _ in mesures]
+    mediane = statistics.median(totaux) / 1000
+    _, cumuls, charges = mesures[totaux.index(sorted(totaux)[len(totaux) // 2])]
+
+    print(f"import {args.module} : médiane {mediane:.1f} ms, "
+          f"min {min(totaux) / 1000:.1f} ms, max {max(totaux) / 1000:.1f} ms "
+          f"({args.repetitions} lancements)")
+    for nom, cumul in sorted(cumuls.items(), key=lambda e: -e[1])[:args.detail]:
+        print(f"  {nom:30s} {cumul / 1000:8.1f} ms")
+    if charges:
+        print(f"Modules lourds chargés au démarrage : {', '.join(charges)}")
+
+    if mediane > args.budget_ms:
+        print(f"Budget dépassé : {mediane:.1f} ms > {args.budget_ms:.0f} ms", file=sys.stderr)
+        return 1
+    print(f"Dans le budget ({args.budget_ms:.0f} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
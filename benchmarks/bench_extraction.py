@@ -0,0 +1,93 @@
+# Micro-benchmark de l'extraction des notes : débit en Mo/s de texte extrait,
+# lecture en une passe (moteur_calcul.extraire_notes_from_txt) contre
+# l'ancienne lecture ligne à ligne, recopiée ci-dessous
+# Exemple: python benchmarks/bench_extraction.py --releves 200
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from moteur_calcul import extraire_notes_from_txt, ExtracteurNotes
+from generateur_releves import texte_releve
+
+
+def extraire_notes_lignes(texte):
+    # Version d'origine, gardée comme référence
+    notes = {}
+    pattern = r'(\d+[.,]\d+)\s*\(coeff\s*(\d+[.,]\d+)\)'
+    matiere_pattern = r'Code ECUE TBFTR(\d{3})'
+    matiere_courante = None
+
+    for ligne in texte.split('\n'):
+        matiere_match = re.search(matiere_pattern, ligne)
+        if matiere_match:
+            num_matiere = matiere_match.group(1)
+            matiere_courante = f"R3.{int(num_matiere):02d}"
+
+        if matiere_courante:
+            for match in re.finditer(pattern, ligne):
+                note = float(match.group(1).replace(',', '.'))
+                coeff = float(match.group(2).replace(',', '.'))
+                if matiere_courante not in notes:
+                    notes[matiere_courante] = []
+                notes[matiere_courante].append((note, coeff))
+
+    sae_pattern = r'TBFTE301.*?(\d+[.,]\d+)\s*\(coeff\s*(\d+[.,]\d+)\)'
+    sae_match = re.search(sae_pattern, texte, re.DOTALL)
+    if sae_match:
+        note = float(sae_match.group(1).replace(',', '.'))
+        coeff = float(sae_match.group(2).replace(',', '.'))
+        notes['SAE3.01'] = [(note, coeff)]
+
+    return notes
+
+
+def mesurer(fonction, textes, repetitions):
+    debut = time.perf_counter()
+    for _ in range(repetitions):
+        for texte in textes:
+            fonction(texte)
+    return time.perf_counter() - debut
+
+
+def par_pages(pages):
+    extracteur = ExtracteurNotes()
+    for page in pages:
+        extracteur.ajouter(page)
+    return extracteur.resultat()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Débit de l'extraction des notes, une passe contre ligne à ligne.")
+    parser.add_argument('--releves', type=int, default=200, help="Nombre de relevés synthétiques")
+    parser.add_argument('--repetitions', type=int, default=20)
+    parser.add_argument('--graine', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.graine)
+    releves = [[page + "\n" for page in texte_releve(rng)] for _ in range(args.releves)]
+    textes = ["".join(pages) for pages in releves]
+    mo = sum(len(t.encode('utf-8')) for t in textes) * args.repetitions / 1e6
+
+    for texte, pages in zip(textes, releves):
+        attendu = extraire_notes_lignes(texte)
+        if extraire_notes_from_txt(texte) != attendu or par_pages(pages) != attendu:
+            print("Résultats différents de la lecture ligne à ligne !", file=sys.stderr)
+            return 1
+
+    reference = mesurer(extraire_notes_lignes, textes, args.repetitions)
+    une_passe = mesurer(extraire_notes_from_txt, textes, args.repetitions)
+    pages = mesurer(par_pages, releves, args.repetitions)
+    print(f"{mo:.1f} Mo de texte ({args.releves} relevés × {args.repetitions})")
+    print(f"ligne à ligne      : {mo / reference:7.1f} Mo/s")
+    print(f"une passe          : {mo / une_passe:7.1f} Mo/s  (×{reference / une_passe:.2f})")
+    print(f"une passe par page : {mo / pages:7.1f} Mo/s  (×{reference / pages:.2f})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
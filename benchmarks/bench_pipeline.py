@@ -0,0 +1,223 @@
+# Benchmark de chaque étape du traitement d'une promotion sur des relevés synthétiques :
+# pdf_to_text, extraire_notes_from_txt, lecture des mêmes textes dans une archive
+# (archive_textes), calculer_moyennes (par étudiant et pour la
+# promotion entière) et génération du CSV, puis chaque moteur de lecture PDF
+# installé comparé à PyPDF2 (vitesse, notes identiques, replis sur PyPDF2)
+# Les mesures sont écrites en JSON ; --comparer affiche l'écart avec un run précédent
+# Exemple: python benchmarks/bench_pipeline.py --tailles 10 100 1000 -o bench.json
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import resource
+import argparse
+import tempfile
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from moteur_calcul import (pdf_to_text, extraire_notes_from_txt, calculer_moyennes_etudiant,
+                           calculer_moyennes_promotion, extraire_nom_prenom,
+                           classer_resultats, extraire_notes_pdf)
+from moteurs_pdf import moteurs_disponibles
+from instrumentation import Mesures
+from stockage_resultats import ResultatsPromotion
+from export_resultats import ECRIVAINS, ErreurExport, ecrire_csv
+from archive_textes import lire_archive, entete_releve
+from generateur_releves import generer_promotion
+
+# pandas et PyPDF2 sont importés à la première utilisation par moteur_calcul ;
+# les charger ici évite de compter leur import dans la première étape mesurée
+import pandas  # noqa: F401
+import PyPDF2  # noqa: F401
+
+
+def rss_max_mo():
+    # ru_maxrss est en Ko sous Linux, en octets sous macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def centile(valeurs, p):
+    valeurs = sorted(valeurs)
+    return valeurs[min(len(valeurs) - 1, int(round(p / 100 * (len(valeurs) - 1))))]
+
+
+def statistiques(nb_releves, total, durees=None):
+    stats = {'total_s': total, 'releves_par_s': nb_releves / total if total else None}
+    if durees:
+        stats['p50_ms'] = centile(durees, 50) * 1000
+        stats['p99_ms'] = centile(durees, 99) * 1000
+    return stats
+
+
+def chronometrer(fonction, entrees):
+    # Appelle fonction sur chaque entrée, retourne (sorties, durée de chaque appel)
+    sorties, durees = [], []
+    for entree in entrees:
+        debut = time.perf_counter()
+        sorties.append(fonction(entree))
+        durees.append(time.perf_counter() - debut)
+    return sorties, durees
+
+
+def mesurer_moteurs(pdfs, notes_reference, duree_reference):
+    # Chaque moteur PDF installé : durée de pdf_to_text, gain par rapport à
+    # PyPDF2, relevés dont les notes sont identiques à celles de PyPDF2 et
+    # relevés relus avec PyPDF2 faute d'un texte exploitable
+    moteurs = {}
+    for moteur in moteurs_disponibles():
+        if moteur == 'pypdf2':
+            continue
+        debut = time.perf_counter()
+        for pdf in pdfs:
+            try:
+                pdf_to_text(pdf, moteur)
+            except Exception:
+                pass
+        duree = time.perf_counter() - debut
+        mesures = Mesures()
+        identiques = sum(extraire_notes_pdf(pdf, False, mesures, moteur) == reference
+                         for pdf, reference in zip(pdfs, notes_reference))
+        moteurs[moteur] = {
+            'pdf_to_text_s': duree,
+            'gain': duree_reference / duree if duree else None,
+            'notes_identiques': identiques,
+            'replis_pypdf2': mesures.compteurs.get('repli_pypdf2', 0),
+        }
+    return moteurs
+
+
+def mesurer_promotion(dossier, nb_etudiants, densite, graine, annexes):
+    chemins = generer_promotion(dossier, nb_etudiants, densite, graine, pages_annexes=annexes)
+    pdfs = [c + ".pdf" for c in chemins]
+    etapes = {}
+
+    textes, durees = chronometrer(pdf_to_text, pdfs)
+    etapes['pdf_to_text'] = statistiques(nb_etudiants, sum(durees), durees)
+
+    notes, durees = chronometrer(extraire_notes_from_txt, textes)
+    etapes['extraire_notes_from_txt'] = statistiques(nb_etudiants, sum(durees), durees)
+
+    # Tous les textes dans une archive, lue d'un bloc : découpage, identité et notes
+    chemin_archive = os.path.join(dossier, "releves.txt")
+    with open(chemin_archive, 'w', encoding='utf-8') as f:
+        for pdf, texte in zip(pdfs, textes):
+            nom_prenom = extraire_nom_prenom(pdf)
+            f.write(entete_releve(nom_prenom['nom'], nom_prenom['prenom']) + texte)
+    debut = time.perf_counter()
+    releves, _ = lire_archive(chemin_archive)
+    etapes['lire_archive'] = statistiques(nb_etudiants, time.perf_counter() - debut)
+    assert [notes_i for _, _, notes_i in releves] == notes
+
+    moyennes, durees = chronometrer(calculer_moyennes_etudiant, notes)
+    etapes['calculer_moyennes'] = statistiques(nb_etudiants, sum(durees), durees)
+
+    debut = time.perf_counter()
+    ues, matieres, *promotion = calculer_moyennes_promotion(notes)
+    etapes['calculer_moyennes_promotion'] = statistiques(nb_etudiants, time.perf_counter() - debut)
+
+    debut = time.perf_counter()
+    resultats = ResultatsPromotion(nb_etudiants, ues, matieres)
+    resultats.ajouter_bloc([extraire_nom_prenom(pdf) for pdf in pdfs], ues, matieres, *promotion)
+    ecrire_csv(classer_resultats(resultats), os.path.join(dossier, "resultats.csv"))
+    etapes['generer_csv'] = statistiques(nb_etudiants, time.perf_counter() - debut)
+
+    # Les autres formats, sur le même tableau déjà classé ; sans pyarrow,
+    # Parquet et Feather sont ignorés
+    df = classer_resultats(resultats)
+    for format_sortie, ecrire in ECRIVAINS.items():
+        if format_sortie == 'csv':
+            continue
+        debut = time.perf_counter()
+        try:
+            ecrire(df, os.path.join(dossier, f"resultats.{format_sortie}"))
+        except ErreurExport:
+            continue
+        etapes[f'export_{format_sortie}'] = statistiques(nb_etudiants, time.perf_counter() - debut)
+
+    moteurs = mesurer_moteurs(pdfs, notes, etapes['pdf_to_text']['total_s'])
+
+    return {
+        'etudiants': nb_etudiants,
+        'densite': densite,
+        'pages_annexes': annexes,
+        'octets_texte': sum(len(t.encode('utf-8')) for t in textes),
+        'etapes': etapes,
+        'moteurs_pdf': moteurs,
+        # Maximum atteint par le processus depuis son démarrage
+        'rss_max_mo': rss_max_mo(),
+    }
+
+
+def afficher(mesure):
+    print(f"\n{mesure['etudiants']} étudiants (densité {mesure['densite']}), "
+          f"RSS max {mesure['rss_max_mo']:.0f} Mo")
+    for etape, stats in mesure['etapes'].items():
+        ligne = f"  {etape:28s} {stats['total_s']:8.3f} s  {stats['releves_par_s']:10.0f} relevés/s"
+        if 'p50_ms' in stats:
+            ligne += f"  p50 {stats['p50_ms']:7.2f} ms  p99 {stats['p99_ms']:7.2f} ms"
+        print(ligne)
+    for moteur, stats in mesure.get('moteurs_pdf', {}).items():
+        print(f"  moteur {moteur:21s} {stats['pdf_to_text_s']:8.3f} s  ×{stats['gain']:.2f} vs pypdf2  "
+              f"notes identiques {stats['notes_identiques']}/{mesure['etudiants']}  "
+              f"replis {stats['replis_pypdf2']}")
+
+
+def comparer(actuel, precedent):
+    # Rapport des durées totales par étape, pour les tailles présentes dans les deux runs
+    anciennes = {m['etudiants']: m for m in precedent['mesures']}
+    print(f"\nComparaison avec le run du {precedent['date']} (>1 = plus lent qu'avant)")
+    for mesure in actuel['mesures']:
+        ancienne = anciennes.get(mesure['etudiants'])
+        if ancienne is None:
+            continue
+        for etape, stats in mesure['etapes'].items():
+            avant = ancienne['etapes'].get(etape)
+            if avant and avant['total_s']:
+                print(f"  {mesure['etudiants']:6d} {etape:28s} ×{stats['total_s'] / avant['total_s']:.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark des étapes du calcul des moyennes.")
+    parser.add_argument('--tailles', type=int, nargs='+', default=[10, 100, 1000],
+                        help="Tailles de promotion à mesurer (10 à 10000)")
+    parser.add_argument('--densite', type=float, default=0.9,
+                        help="Probabilité qu'une ressource ait des notes")
+    parser.add_argument('--annexes', type=int, default=0, help="Pages d'annexe par relevé")
+    parser.add_argument('--graine', type=int, default=0)
+    parser.add_argument('-o', '--sortie', default='bench_resultats.json')
+    parser.add_argument('--comparer', metavar='JSON', help="Résultats d'un run précédent")
+    parser.add_argument('--garder', metavar='DOSSIER',
+                        help="Générer les relevés dans ce dossier et le conserver")
+    args = parser.parse_args(argv)
+
+    resultat = {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'mesures': [],
+    }
+    racine = args.garder or tempfile.mkdtemp(prefix='bench_releves_')
+    try:
+        for taille in args.tailles:
+            dossier = os.path.join(racine, f"promo_{taille}")
+            mesure = mesurer_promotion(dossier, taille, args.densite, args.graine, args.annexes)
+            resultat['mesures'].append(mesure)
+            afficher(mesure)
+    finally:
+        if not args.garder:
+            shutil.rmtree(racine, ignore_errors=True)
+
+    with open(args.sortie, 'w', encoding='utf-8') as f:
+        json.dump(resultat, f, indent=2, ensure_ascii=False)
+    print(f"\nRésultats écrits dans {args.sortie}")
+
+    if args.comparer:
+        with open(args.comparer, encoding='utf-8') as f:
+            comparer(resultat, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# Génération de relevés synthétiques pour les benchmarks
+# Produit des PDF Releve-NOM-PRENOM-TBFS3T-AAAA-AAAA.pdf (et/ou le texte
+# équivalent en .txt) dans la mise en forme lue par moteur_calcul, ou une
+# archive de tous les textes (voir archive_textes)
+# Exemple: python benchmarks/generateur_releves.py /tmp/promo --etudiants 500
+import os
+import sys
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from matieres_coeffs import MATIERES
+from archive_textes import entete_releve
+
+RESSOURCES = [m for m in MATIERES if m.startswith('R3.')]
+LIGNES_PAR_PAGE = 60
+
+
+def texte_releve(rng, densite=0.9, pages_annexes=0):
+    # Liste du texte de chaque page d'un relevé
+    # densite: probabilité qu'une ressource ait des notes, et qu'une évaluation
+    # supplémentaire soit présente
+    lignes = ["Relevé de notes - Année universitaire 2024-2025",
+              "BUT 2e année - Semestre 3"]
+    for ressource in RESSOURCES:
+        num = ressource.split('.')[1]
+        lignes.append(f"Code ECUE TBFTR3{num} Ressource {ressource} - Intitulé de la ressource")
+        if rng.random() > densite:
+            lignes.append("Pas d'évaluation")
+            continue
+        nb_evals = 1
+        while nb_evals < 6 and rng.random() < densite * 0.6:
+            nb_evals += 1
+        evals = [f"{rng.uniform(0, 20):.2f} (coeff {rng.choice([0.5, 1, 2]):.2f})".replace('.', ',')
+                 for _ in range(nb_evals)]
+        for i in range(0, nb_evals, 3):
+            lignes.append("Évaluation  " + "  ".join(evals[i:i + 3]))
+        lignes.append("Commentaire de l'enseignant")
+    lignes.append("Code ECUE TBFTE301 SAE 3.01 Développement d'une application")
+    if rng.random() <= densite:
+        lignes.append(f"{rng.uniform(5, 20):.2f} (coeff 1,00)".replace('.', ','))
+
+    pages = ["\n".join(lignes[i:i + LIGNES_PAR_PAGE])
+             for i in range(0, len(lignes), LIGNES_PAR_PAGE)]
+    for i in range(pages_annexes):
+        pages.append("\n".join([f"Annexe {i + 1} - Règlement des études"] +
+                               ["Article sans note, texte de remplissage."] * LIGNES_PAR_PAGE))
+    return pages
+
+
+def _echapper(ligne):
+    return ligne.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def pdf_releve(pages):
+    # PDF minimal (une police Helvetica, une ligne de texte par ligne du relevé)
+    objets = [b"<< /Type /Catalog /Pages 2 0 R >>"]
+    kids = " ".join(f"{4 + 2 * i} 0 R" for i in range(len(pages)))
+    objets.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+    objets.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica"
+                  b" /Encoding /WinAnsiEncoding >>")
+    for i, page in enumerate(pages):
+        objets.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842]"
+                      f" /Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>".encode())
+        contenu = "BT /F1 9 Tf 30 820 Td 12 TL\n" + "".join(
+            f"({_echapper(ligne)}) Tj T*\n" for ligne in page.split("\n")) + "ET"
+        flux = contenu.encode('cp1252')
+        objets.append(b"<< /Length %d >>\nstream\n" % len(flux) + flux + b"\nendstream")
+
+    sortie = bytearray(b"%PDF-1.4\n")
+    positions = []
+    for num, objet in enumerate(objets, 1):
+        positions.append(len(sortie))
+        sortie += b"%d 0 obj\n" % num + objet + b"\nendobj\n"
+    debut_xref = len(sortie)
+    sortie += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objets) + 1)
+    sortie += b"".join(b"%010d 00000 n \n" % p for p in positions)
+    sortie += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objets) + 1, debut_xref)
+    return bytes(sortie)
+
+
+def nom_fichier(i, annee=2024):
+    return f"Releve-NOM{i:05d}-PRENOM{i:05d}-TBFS3T-{annee}-{annee + 1}"
+
+
+def generer_promotion(dossier, nb_etudiants, densite=0.9, graine=0, pdf=True, texte=True,
+                      pages_annexes=0, archive=None):
+    # Écrit nb_etudiants relevés dans dossier, retourne la liste des chemins sans extension
+    # archive: fichier où écrire aussi tous les textes, chacun après son en-tête
+    os.makedirs(dossier, exist_ok=True)
+    rng = random.Random(graine)
+    chemins = []
+    fichier_archive = open(archive, 'w', encoding='utf-8') if archive else None
+    for i in range(nb_etudiants):
+        pages = texte_releve(rng, densite, pages_annexes)
+        chemin = os.path.join(dossier, nom_fichier(i))
+        if pdf:
+            with open(chemin + ".pdf", 'wb') as f:
+                f.write(pdf_releve(pages))
+        if texte:
+            # Même forme que pdf_to_text : chaque page suivie d'un retour à la ligne
+            with open(chemin + ".txt", 'w', encoding='utf-8') as f:
+                f.write("".join(page + "\n" for page in pages))
+        if fichier_archive:
+            fichier_archive.write(entete_releve(f"NOM{i:05d}", f"PRENOM{i:05d}"))
+            fichier_archive.write("".join(page + "\n" for page in pages))
+        chemins.append(chemin)
+    if fichier_archive:
+        fichier_archive.close()
+    return chemins
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Génère une promotion de relevés synthétiques.")
+    parser.add_argument('dossier')
+    parser.add_argument('--etudiants', type=int, default=100)
+    parser.add_argument('--densite', type=float, default=0.9,
+                        help="Probabilité qu'une ressource ait des notes (0 à 1)")
+    parser.add_argument('--annexes', type=int, default=0, help="Pages d'annexe sans note par relevé")
+    parser.add_argument('--graine', type=int, default=0)
+    parser.add_argument('--sans-pdf', action='store_true')
+    parser.add_argument('--sans-texte', action='store_true')
+    parser.add_argument('--archive', metavar='TXT',
+                        help="Écrire aussi tous les textes dans une seule archive")
+    args = parser.parse_args(argv)
+
+    chemins = generer_promotion(args.dossier, args.etudiants, args.densite, args.graine,
+                                pdf=not args.sans_pdf, texte=not args.sans_texte,
+                                pages_annexes=args.annexes, archive=args.archive)
+    print(f"{len(chemins)} relevés écrits dans {args.dossier}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+# Cache disque des notes extraites des relevés PDF
+# Clé: empreinte SHA-256 du contenu du PDF (suivie de :<moteur> hors pypdf2) + version de l'extracteur
+# Valeur: le dictionnaire {matiere: [(note, coeff)]} de extraire_notes_from_txt
+# Les entrées les moins récemment utilisées sont supprimées au-delà de taille_max
+# Chaque put est validé aussitôt (journal WAL) : plusieurs processus (interface,
+# batch, surveillance) partagent le même fichier sans se bloquer, et un
+# processus tué ne perd pas ce qu'il a déjà mis en cache
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+from moteur_calcul import VERSION_EXTRACTEUR, empreinte_fichier
+from instrumentation import journal
+
+CHEMIN_DEFAUT = os.path.join(os.path.expanduser('~'), '.cache', 'calcul_moyenne',
+                             'extraction.sqlite3')
+TAILLE_MAX_DEFAUT = 64 * 1024 * 1024  # octets de données stockées
+
+
+class CacheExtraction:
+    def __init__(self, chemin=CHEMIN_DEFAUT, version=VERSION_EXTRACTEUR,
+                 taille_max=TAILLE_MAX_DEFAUT):
+        if chemin != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(chemin)), exist_ok=True)
+        self.version = version
+        self.taille_max = taille_max
+        self.connexion = sqlite3.connect(chemin)
+        # Les lecteurs ne bloquent pas l'écrivain et inversement ; en WAL,
+        # synchronous=NORMAL garde la base cohérente après un arrêt brutal
+        self.connexion.execute("PRAGMA journal_mode=WAL")
+        self.connexion.execute("PRAGMA synchronous=NORMAL")
+        # Dates d'accès des get, écrites avec le prochain put ou par valider()
+        # pour qu'un get n'ouvre pas de transaction d'écriture
+        self._acces = {}
+        self.connexion.execute(
+            "CREATE TABLE IF NOT EXISTS extraction ("
+            " empreinte TEXT NOT NULL,"
+            " version INTEGER NOT NULL,"
+            " donnees TEXT NOT NULL,"
+            " taille INTEGER NOT NULL,"
+            " acces REAL NOT NULL,"
+            " PRIMARY KEY (empreinte, version))")
+        self.connexion.execute(
+            "CREATE INDEX IF NOT EXISTS extraction_acces ON extraction (acces)")
+
+    def get(self, empreinte):
+        # Un cache illisible (verrouillé, corrompu) compte comme une absence
+        try:
+            ligne = self.connexion.execute(
+                "SELECT donnees FROM extraction WHERE empreinte = ? AND version = ?",
+                (empreinte, self.version)).fetchone()
+        except sqlite3.Error as e:
+            journal.warning("Cache d'extraction illisible : %s", e)
+            return None
+        if ligne is None:
+            return None
+        self._acces[empreinte] = time.time()
+        # JSON ne connaît pas les tuples, on les reconstruit
+        return {matiere: [tuple(n) for n in notes]
+                for matiere, notes in json.loads(ligne[0]).items()}
+
+    def put(self, empreinte, notes):
+        # Les notes restent valables si le cache ne peut pas les garder
+        donnees = json.dumps(notes, separators=(',', ':'))
+        try:
+            with self.connexion:
+                self.connexion.execute(
+                    "INSERT OR REPLACE INTO extraction VALUES (?, ?, ?, ?, ?)",
+                    (empreinte, self.version, donnees, len(donnees), time.time()))
+                self._ecrire_acces()
+        except sqlite3.Error as e:
+            journal.warning("Cache d'extraction non mis à jour : %s", e)
+
+    def valider(self):
+        # Écrit les dates d'accès en attente et fait la place au-delà de
+        # taille_max ; appelée à la fermeture et après chaque passe du mode
+        # surveillance. Un cache occupé par un autre processus ne fait pas
+        # échouer le traitement : ce sera fait au prochain appel
+        try:
+            with self.connexion:
+                self._ecrire_acces()
+            self.evincer()
+        except sqlite3.Error as e:
+            journal.warning("Cache d'extraction non mis à jour : %s", e)
+
+    def _ecrire_acces(self):
+        if self._acces:
+            self.connexion.executemany(
+                "UPDATE extraction SET acces = ? WHERE empreinte = ? AND version = ?",
+                [(acces, empreinte, self.version) for empreinte, acces in self._acces.items()])
+            self._acces.clear()
+
+    def evincer(self):
+        # Supprime les entrées les plus anciennes jusqu'à repasser sous taille_max
+        total = self.connexion.execute(
+            "SELECT COALESCE(SUM(taille), 0) FROM extraction").fetchone()[0]
+        if total <= self.taille_max:
+            return 0
+        a_supprimer = []
+        for empreinte, version, taille in self.connexion.execute(
+                "SELECT empreinte, version, taille FROM extraction ORDER BY acces"):
+            if total <= self.taille_max:
+                break
+            a_supprimer.append((empreinte, version))
+            total -= taille
+        with self.connexion:
+            self.connexion.executemany(
+                "DELETE FROM extraction WHERE empreinte = ? AND version = ?", a_supprimer)
+        return len(a_supprimer)
+
+    def invalider(self, empreinte=None):
+        # Sans argument, vide tout le cache
+        if empreinte is None:
+            self.connexion.execute("DELETE FROM extraction")
+        else:
+            # Avec les entrées des autres moteurs de lecture (empreinte:moteur)
+            self.connexion.execute(
+                "DELETE FROM extraction WHERE empreinte = ? OR empreinte LIKE ?",
+                (empreinte, empreinte + ':%'))
+        self.connexion.commit()
+
+    def close(self):
+        self.valider()
+        self.connexion.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gestion du cache d'extraction des relevés PDF.")
+    parser.add_argument('--chemin', default=CHEMIN_DEFAUT, help="Fichier du cache")
+    parser.add_argument('--vider', action='store_true', help="Supprimer toutes les entrées")
+    parser.add_argument('--invalider', nargs='+', metavar='PDF',
+                        help="Supprimer les entrées de ces relevés")
+    args = parser.parse_args(argv)
+
+    code_retour = 0
+    with CacheExtraction(args.chemin) as cache:
+        if args.vider:
+            cache.invalider()
+        for pdf_path in args.invalider or []:
+            # Un fichier illisible n'empêche pas d'invalider les suivants
+            try:
+                empreinte = empreinte_fichier(pdf_path)
+            except OSError as e:
+                print(f"{pdf_path}: {e.strerror or e}", file=sys.stderr)
+                code_retour = 1
+                continue
+            cache.invalider(empreinte)
+        nb, taille = cache.connexion.execute(
+            "SELECT COUNT(*), COALESCE(SUM(taille), 0) FROM extraction").fetchone()
+        print(f"{args.chemin} : {nb} relevé(s), {taille / 1024:.1f} Ko")
+    return code_retour
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,37 +1,28 @@
 import sys
-import subprocess
-import importlib.util
 
-def check_and_install_packages():
-    required_packages = ['tkinter', 'PyPDF2', 'pandas']
-    
-    for package in required_packages:
-        # tkinter est généralement inclus avec Python, pas besoin de l'installer via pip
-        if package == 'tkinter':
-            continue
-            
-        # Vérifie si le package est installé
-        if importlib.util.find_spec(package) is None:
-            print(f"Installation du module {package}...")
-            try:
-                subprocess.check_call([sys.executable, '-m', 'pip', 'install', package])
-                print(f"{package} a été installé avec succès!")
-            except subprocess.CalledProcessError as e:
-                print(f"Erreur lors de l'installation de {package}: {e}")
-                sys.exit(1)
-
-# Vérifier et installer les packages au démarrage
-check_and_install_packages()
+# Les dépendances ne sont vérifiées et installées que sur demande, avant les
+# imports qui en ont besoin : python calcul_moyenne.py --installer-dependances
+# (ou python dependances.py --installer)
+if __name__ == "__main__" and '--installer-dependances' in sys.argv[1:]:
+    from dependances import check_and_install_packages
+    check_and_install_packages()
 
-import re
 import os
+import time
+import queue
+import threading
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import ttk, messagebox, filedialog
-from PyPDF2 import PdfReader
-import pandas as pd
 from datetime import datetime
 # Importer les matières et les coefficients depuis le nouveau fichier
 from matieres_coeffs import MATIERES, COEFFICIENTS
+# Le calcul lui-même est dans moteur_calcul, partagé avec le mode ligne de commande
+from moteur_calcul import (ErreurLecturePDF, TraitementAnnule, extraire_notes_pdf,
+                           extraire_nom_prenom, calculer_moyennes_etudiant, extraire_lot)
+from export_resultats import ErreurExport, ecrire_resultats
+from cache_extraction import CacheExtraction
+from classement import ClassementPromotion
 
 class ApplicationNotes:
     def __init__(self, root):
@@ -40,8 +31,16 @@ class ApplicationNotes:
         
         # Dictionnaire pour stocker les notes de chaque matière
         self.notes_par_matiere = {}
-        # Résultats pour le mode batch
-        self.resultats_batch = []
+        # Classement de la promotion en mode batch (classement.ClassementPromotion)
+        self.classement = None
+        
+        # Le batch tourne dans un thread à part ; il envoie sa progression et
+        # son résultat par cette file, lue par suivre_batch toutes les 100 ms
+        self.executeur = ThreadPoolExecutor(max_workers=1)
+        self.messages_batch = queue.Queue()
+        self.annulation = None  # threading.Event du batch en cours
+        self.debut_batch = None
+        self.root.protocol("WM_DELETE_WINDOW", self.fermer)
         
         # Frame principal
         self.main_frame = ttk.Frame(self.root, padding="10")
@@ -63,7 +62,14 @@ class ApplicationNotes:
         # Checkbox pour ignorer SAE3.01
         self.ignore_sae = tk.BooleanVar(value=True)  # Activée par défaut
         ttk.Checkbutton(self.pdf_frame, text="Ignorer et neutraliser SAE3.01", 
-                        variable=self.ignore_sae).pack(side=tk.RIGHT, padx=5, pady=10)
+                        variable=self.ignore_sae,
+                        command=self.option_sae_modifiee).pack(side=tk.RIGHT, padx=5, pady=10)
+        
+        # Nombre de processus utilisés en mode batch
+        self.nb_processus = tk.IntVar(value=os.cpu_count() or 1)
+        ttk.Spinbox(self.pdf_frame, from_=1, to=64, width=3,
+                    textvariable=self.nb_processus).pack(side=tk.RIGHT, padx=5, pady=10)
+        ttk.Label(self.pdf_frame, text="Processus :").pack(side=tk.RIGHT)
         
         # Barre de progression (cachée par défaut)
         self.progress_frame = ttk.Frame(self.main_frame)
@@ -74,6 +80,9 @@ class ApplicationNotes:
                                             mode='determinate', length=400)
         self.progress_bar.pack(side=tk.LEFT, padx=5, pady=5, expand=True, fill=tk.X)
         
+        ttk.Button(self.progress_frame, text="Annuler",
+                  command=self.annuler_batch).pack(side=tk.RIGHT, padx=5)
+        
         self.progress_label = ttk.Label(self.progress_frame, text="")
         self.progress_label.pack(side=tk.RIGHT, padx=5)
         
@@ -94,6 +103,8 @@ class ApplicationNotes:
         
         ttk.Button(self.control_frame, text="Calculer les moyennes", 
                   command=self.calculer_moyennes).pack(side=tk.LEFT, padx=5)
+        ttk.Button(self.control_frame, text="Exporter le classement", 
+                  command=self.generer_csv).pack(side=tk.LEFT, padx=5)
         ttk.Button(self.control_frame, text="Effacer tout", 
                   command=self.effacer_tout).pack(side=tk.RIGHT, padx=5)
         
@@ -117,144 +128,150 @@ class ApplicationNotes:
             self.notes_par_matiere.clear()
             self.notes_text.delete(1.0, tk.END)
             self.resultats.delete(1.0, tk.END)
-            self.resultats_batch = []
+            self.classement = None
     
-    def calculer_moyennes(self, pdf_path=None):
-        # Utiliser les coefficients importés
-        coeffs = COEFFICIENTS
+    def calculer_moyennes(self):
+        moyennes_ue, moyenne_generale, _ = calculer_moyennes_etudiant(
+            self.notes_par_matiere, self.ignore_sae.get(), COEFFICIENTS)
+        
+        self.resultats.delete(1.0, tk.END)
+        self.resultats.insert(tk.END, "Moyennes par UE :\n")
+        self.resultats.insert(tk.END, "-" * 40 + "\n")
         
-        # Convertir les clés des notes au bon format (R3.301 -> R3.01)
-        notes_converties = {}
-        for matiere, notes in self.notes_par_matiere.items():
-            if matiere == 'SAE3.01':  # Pas besoin de convertir les SAE
-                if not self.ignore_sae.get():  # Ajouter seulement si on n'ignore pas SAE3.01
-                    notes_converties[matiere] = notes
+        for ue, moyenne in moyennes_ue.items():
+            if moyenne is not None:
+                self.resultats.insert(tk.END, f"{ue}: {moyenne:.2f}/20\n")
             else:
-                # Extraire le numéro à 3 chiffres et le convertir en 2 chiffres
-                num = matiere.split('.')[1]  # '301', '302', etc.
-                nouvelle_cle = f"R3.{int(num[-2:]):02d}"  # Prend les 2 derniers chiffres
-                notes_converties[nouvelle_cle] = notes
+                self.resultats.insert(tk.END, f"{ue}: Notes manquantes\n")
         
-        print("\nNotes après conversion des clés:")
-        for matiere, notes in sorted(notes_converties.items()):
-            print(f"{matiere}: {notes}")
+        self.resultats.insert(tk.END, "-" * 40 + "\n")
+        if moyenne_generale is not None:
+            self.resultats.insert(tk.END, f"Moyenne générale: {moyenne_generale:.2f}/20\n")
+        else:
+            self.resultats.insert(tk.END, f"Moyenne générale: Notes insuffisantes\n")
         
-        # Si on est en mode batch, on ne réinitialise pas les résultats
-        if not self.mode_batch.get() or pdf_path is None:
+        return moyennes_ue, moyenne_generale
+    
+    def option_sae_modifiee(self):
+        # Après un batch, seules les UE qui contiennent la SAE sont recalculées
+        if self.classement is not None:
+            self.classement.changer_ignore_sae(self.ignore_sae.get())
             self.resultats.delete(1.0, tk.END)
-            self.resultats.insert(tk.END, "Moyennes par UE :\n")
-            self.resultats.insert(tk.END, "-" * 40 + "\n")
-        
-        # Dictionnaire pour stocker les moyennes par UE et par ressource
-        moyennes_ue = {}
-        moyennes_ressources = {}
-        
-        for ue, matieres_coeffs in coeffs.items():
-            print(f"\nCalcul pour {ue}:")
-            somme_ponderee = 0
-            somme_coeffs = 0
+            self.resultats.insert(tk.END, self.classement.resume())
+    
+    def mettre_a_jour_progression(self, fait, total):
+        progress_pct = (fait / total) * 100
+        self.progress_var.set(progress_pct)
+        texte = f"{int(progress_pct)}%"
+        # Temps restant estimé d'après le débit mesuré depuis le début du batch
+        if 0 < fait < total:
+            restant = (time.perf_counter() - self.debut_batch) / fait * (total - fait)
+            texte += f" - reste {int(restant // 60)} min {int(restant % 60):02d} s"
+        self.progress_label.config(text=texte)
+
+    def traiter_batch(self, pdf_paths, workers, ignore_sae, annulation):
+        # Exécuté dans le thread de l'exécuteur : ne touche pas à Tkinter
+        def progression(fait, total):
+            self.messages_batch.put(('progression', fait, total))
+
+        def releve_lu(pdf_path, notes_i):
+            self.messages_batch.put(('notes', notes_i))
+
+        try:
+            # La connexion SQLite du cache reste dans ce thread
+            with CacheExtraction() as cache:
+                notes, erreurs = extraire_lot(pdf_paths, progression=progression,
+                                              workers=workers, cache=cache,
+                                              annulation=annulation, releve_lu=releve_lu)
             
-            for matiere, coeff_ue in matieres_coeffs.items():
-                print(f"  Traitement de {matiere} (coeff UE: {coeff_ue})")
-                
-                # Ignorer SAE3.01 si la case est cochée
-                if matiere == 'SAE3.01' and self.ignore_sae.get():
-                    print(f"    SAE3.01 ignorée car la case est cochée")
-                    continue
-                    
-                if matiere in notes_converties:
-                    notes_matiere = notes_converties[matiere]
-                    print(f"    Notes trouvées: {notes_matiere}")
-                    
-                    # Calculer la moyenne pondérée de la matière
-                    somme_ponderee_matiere = sum(note * coeff for note, coeff in notes_matiere)
-                    somme_coeffs_matiere = sum(coeff for _, coeff in notes_matiere)
-                    
-                    if somme_coeffs_matiere > 0:
-                        moyenne_matiere = somme_ponderee_matiere / somme_coeffs_matiere
-                        moyennes_ressources[matiere] = moyenne_matiere
-                        contribution = moyenne_matiere * coeff_ue
-                        somme_ponderee += contribution
-                        somme_coeffs += coeff_ue
-                        print(f"    Moyenne matière: {moyenne_matiere:.2f}")
-                        print(f"    Contribution à l'UE: {contribution:.2f}")
+            # Les moyennes par ressource sont gardées : changer l'option SAE
+            # ensuite ne relit pas les relevés
+            lus = [(pdf_path, notes_i) for pdf_path, notes_i in zip(pdf_paths, notes)
+                   if notes_i is not None]
+            classement = None
+            if lus:
+                classement = ClassementPromotion(
+                    [extraire_nom_prenom(pdf_path) for pdf_path, _ in lus],
+                    [notes_i for _, notes_i in lus], COEFFICIENTS, ignore_sae)
+            self.messages_batch.put(('fini', classement, erreurs))
+        except TraitementAnnule:
+            self.messages_batch.put(('annule',))
+        except Exception as e:
+            self.messages_batch.put(('erreur', str(e)))
+
+    def suivre_batch(self):
+        # Vide la file ; seules la dernière progression et les notes du dernier
+        # relevé lu sont affichées, la fenêtre est donc redessinée au plus une
+        # fois par passage (toutes les 100 ms) quel que soit le débit du lot
+        progression, notes, fin = None, None, None
+        try:
+            while True:
+                message = self.messages_batch.get_nowait()
+                if message[0] == 'progression':
+                    progression = message
+                elif message[0] == 'notes':
+                    notes = message[1]
                 else:
-                    print(f"    Pas de notes pour cette matière")
-            
-            print(f"  Somme pondérée finale: {somme_ponderee:.2f}")
-            print(f"  Somme coeffs finale: {somme_coeffs:.2f}")
-            
-            if somme_coeffs > 0:
-                moyenne = somme_ponderee / somme_coeffs
-                moyennes_ue[ue] = moyenne
-                
-                if not self.mode_batch.get() or pdf_path is None:
-                    self.resultats.insert(tk.END, f"{ue}: {moyenne:.2f}/20\n")
-                print(f"  Moyenne {ue}: {moyenne:.2f}/20")
-            else:
-                moyennes_ue[ue] = None
-                
-                if not self.mode_batch.get() or pdf_path is None:
-                    self.resultats.insert(tk.END, f"{ue}: Notes manquantes\n")
-                print(f"  {ue}: Notes manquantes")
+                    fin = message
+        except queue.Empty:
+            pass
         
-        # Calculer la moyenne générale (moyenne des moyennes d'UE)
-        moyennes_valides = [moy for moy in moyennes_ue.values() if moy is not None]
-        if moyennes_valides:
-            moyenne_generale = sum(moyennes_valides) / len(moyennes_valides)
-            
-            if not self.mode_batch.get() or pdf_path is None:
-                self.resultats.insert(tk.END, "-" * 40 + "\n")
-                self.resultats.insert(tk.END, f"Moyenne générale: {moyenne_generale:.2f}/20\n")
-            print(f"  Moyenne générale: {moyenne_generale:.2f}/20")
-        else:
-            moyenne_generale = None
-            
-            if not self.mode_batch.get() or pdf_path is None:
-                self.resultats.insert(tk.END, "-" * 40 + "\n")
-                self.resultats.insert(tk.END, f"Moyenne générale: Notes insuffisantes\n")
-            print(f"  Moyenne générale: Notes insuffisantes")
+        if notes is not None:
+            self.notes_par_matiere = notes
+            self.afficher_notes()
+        if progression is not None:
+            self.mettre_a_jour_progression(progression[1], progression[2])
+        if fin is None:
+            self.root.after(100, self.suivre_batch)
+            return
         
-        # Si on est en mode batch, on stocke les résultats pour le CSV
-        if self.mode_batch.get() and pdf_path:
-            # Extraire le nom et prénom du fichier
-            nom_prenom = self.extraire_nom_prenom(pdf_path)
-            
-            resultat_etudiant = {
-                'Nom': nom_prenom['nom'],
-                'Prénom': nom_prenom['prenom'],
-                'Moyenne générale': moyenne_generale
-            }
+        self.annulation = None
+        if fin[0] == 'annule':
+            self.progress_label.config(text="Annulé")
+        elif fin[0] == 'erreur':
+            messagebox.showerror("Erreur", fin[1])
+        else:
+            _, self.classement, erreurs = fin
+            # L'option SAE a pu changer pendant le traitement
+            if self.classement is not None:
+                self.classement.changer_ignore_sae(self.ignore_sae.get())
             
-            # Ajouter les moyennes par UE
-            for ue, moyenne in moyennes_ue.items():
-                if moyenne is not None:
-                    resultat_etudiant[ue] = moyenne
-                else:
-                    resultat_etudiant[ue] = float('nan')
+            # Un seul message récapitulatif pour les fichiers en erreur
+            if erreurs:
+                details = "\n".join(f"{os.path.basename(chemin)} : {message}"
+                                    for chemin, message in erreurs)
+                messagebox.showerror(
+                    "Erreur",
+                    f"{len(erreurs)} relevé(s) n'ont pas pu être lus :\n{details}")
             
-            # Ajouter les moyennes par ressource
-            for matiere, moyenne in moyennes_ressources.items():
-                resultat_etudiant[matiere] = moyenne
+            # Terminer la barre de progression
+            self.progress_var.set(100)
+            self.progress_label.config(text="100%")
             
-            self.resultats_batch.append(resultat_etudiant)
+            # Exporter le classement
+            if self.classement is not None:
+                self.generer_csv()
         
-        return moyennes_ue, moyenne_generale
-    
-    def extraire_nom_prenom(self, pdf_path):
-        # Extraire le nom du fichier sans le chemin
-        nom_fichier = os.path.basename(pdf_path)
-        # Format attendu: Releve-NOM-PRENOM-TBFS3T-2024-2025.pdf
-        match = re.match(r'Releve-([^-]+)-([^-]+)-TBFS3T-\d{4}-\d{4}', nom_fichier)
-        
-        if match:
-            return {'nom': match.group(1), 'prenom': match.group(2)}
-        else:
-            # Si le format ne correspond pas, utiliser le nom du fichier
-            return {'nom': nom_fichier, 'prenom': ''}
+        # Cacher la barre de progression après quelques secondes
+        self.root.after(2000, lambda: self.progress_frame.pack_forget())
+
+    def annuler_batch(self):
+        if self.annulation is not None:
+            self.annulation.set()
+            self.progress_label.config(text="Annulation...")
+
+    def fermer(self):
+        # Le batch en cours s'arrête après le fichier en cours de lecture
+        self.annuler_batch()
+        self.executeur.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
 
     def charger_pdf(self):
         if self.mode_batch.get():
+            if self.annulation is not None:
+                messagebox.showinfo("Batch", "Un traitement batch est déjà en cours.")
+                return
+            
             # Mode batch: sélection de plusieurs fichiers
             pdf_paths = filedialog.askopenfilenames(
                 title="Sélectionner les relevés de notes PDF",
@@ -263,44 +280,22 @@ class ApplicationNotes:
             
             if pdf_paths:
                 # Réinitialiser les résultats batch
-                self.resultats_batch = []
+                self.classement = None
                 
                 # Afficher la barre de progression
                 self.progress_frame.pack(fill=tk.X, pady=5, after=self.pdf_frame)
                 self.progress_var.set(0)
                 self.progress_label.config(text="0%")
                 
-                # Traiter chaque fichier
-                total_files = len(pdf_paths)
-                for i, pdf_path in enumerate(pdf_paths):
-                    # Mettre à jour la barre de progression
-                    progress_pct = (i / total_files) * 100
-                    self.progress_var.set(progress_pct)
-                    self.progress_label.config(text=f"{int(progress_pct)}%")
-                    self.root.update_idletasks()
-                    
-                    # Convertir le PDF en texte
-                    texte = pdf_to_text(pdf_path)
-                    if texte:
-                        # Extraire les notes
-                        self.notes_par_matiere = extraire_notes_from_txt(texte)
-                        
-                        # Afficher les notes du fichier courant
-                        self.afficher_notes()
-                        
-                        # Calculer les moyennes pour ce relevé
-                        self.calculer_moyennes(pdf_path)
-                
-                # Terminer la barre de progression
-                self.progress_var.set(100)
-                self.progress_label.config(text="100%")
-                
-                # Générer le CSV avec les résultats
-                if self.resultats_batch:
-                    self.generer_csv()
-                
-                # Cacher la barre de progression après quelques secondes
-                self.root.after(2000, lambda: self.progress_frame.pack_forget())
+                # Traiter les fichiers en arrière-plan sur un pool de processus ;
+                # la fenêtre reste utilisable et le batch peut être annulé
+                # Les relevés déjà lus lors d'un traitement précédent viennent du cache
+                self.annulation = threading.Event()
+                self.debut_batch = time.perf_counter()
+                self.executeur.submit(self.traiter_batch, list(pdf_paths),
+                                      self.nb_processus.get(), self.ignore_sae.get(),
+                                      self.annulation)
+                self.root.after(100, self.suivre_batch)
         else:
             # Mode normal: sélection d'un seul fichier
             pdf_path = filedialog.askopenfilename(
@@ -309,119 +304,49 @@ class ApplicationNotes:
             )
             
             if pdf_path:
-                # Convertir le PDF en texte
-                texte = pdf_to_text(pdf_path)
-                if texte:
-                    # Extraire les notes
-                    notes = extraire_notes_from_txt(texte)
-                    
-                    # Mettre à jour les notes dans l'application
-                    self.notes_par_matiere = notes
-                    
-                    # Afficher les notes
-                    self.afficher_notes()
-                    messagebox.showinfo("Succès", "Les notes ont été importées avec succès !")
+                # Lire le PDF page par page et extraire les notes
+                try:
+                    notes = extraire_notes_pdf(pdf_path)
+                except ErreurLecturePDF as e:
+                    messagebox.showerror("Erreur", str(e))
+                    return
+                
+                # Mettre à jour les notes dans l'application
+                self.notes_par_matiere = notes
+                
+                # Afficher les notes
+                self.afficher_notes()
+                messagebox.showinfo("Succès", "Les notes ont été importées avec succès !")
     
     def generer_csv(self):
-        # Convertir la liste de dictionnaires en DataFrame
-        df = pd.DataFrame(self.resultats_batch)
+        if self.classement is None:
+            messagebox.showinfo("Export", "Aucun classement : chargez d'abord des relevés en mode batch.")
+            return
         
-        # Trier par moyenne générale décroissante
-        df = df.sort_values(by='Moyenne générale', ascending=False)
-        
-        # Ajouter le rang
-        df['Rang'] = range(1, len(df) + 1)
-        
-        # Réorganiser les colonnes (nom, prénom, rang, moyenne générale, puis le reste)
-        colonnes = ['Nom', 'Prénom', 'Rang', 'Moyenne générale'] + [
-            col for col in df.columns if col not in ['Nom', 'Prénom', 'Rang', 'Moyenne générale']
-        ]
-        df = df[colonnes]
+        # Tableau trié avec le rang, à jour de l'option SAE courante
+        df = self.classement.dataframe()
         
         # Définir le nom du fichier avec la date
         date_str = datetime.now().strftime("%Y%m%d_%H%M%S")
         file_path = filedialog.asksaveasfilename(
             defaultextension=".csv",
-            filetypes=[("Fichiers CSV", "*.csv")],
+            filetypes=[("Fichiers CSV", "*.csv"), ("Classeur Excel", "*.xlsx"),
+                       ("Parquet", "*.parquet"), ("Feather", "*.feather")],
             initialfile=f"resultats_promotion_{date_str}.csv"
         )
         
         if file_path:
-            # Sauvegarder en CSV
-            df.to_csv(file_path, index=False, sep=';', decimal=',')
-            messagebox.showinfo("Succès", f"Fichier CSV généré avec succès !\n{file_path}")
+            # Sauvegarder dans le format correspondant à l'extension choisie
+            try:
+                ecrire_resultats(df, file_path)
+            except ErreurExport as e:
+                messagebox.showerror("Erreur", str(e))
+                return
+            messagebox.showinfo("Succès", f"Fichier généré avec succès !\n{file_path}")
             
             # Afficher un résumé dans la zone de résultats
             self.resultats.delete(1.0, tk.END)
-            self.resultats.insert(tk.END, f"Résumé du traitement batch ({len(df)} étudiants) :\n")
-            self.resultats.insert(tk.END, "-" * 40 + "\n")
-            
-            # Afficher les 3 premiers et les 3 derniers
-            top3 = df.head(3)
-            bottom3 = df.tail(3)
-            
-            self.resultats.insert(tk.END, "Top 3 :\n")
-            for _, row in top3.iterrows():
-                self.resultats.insert(tk.END, f"{row['Rang']}. {row['Prénom']} {row['Nom']}: {row['Moyenne générale']:.2f}/20\n")
-            
-            self.resultats.insert(tk.END, "\nDerniers :\n")
-            for _, row in bottom3.iterrows():
-                self.resultats.insert(tk.END, f"{row['Rang']}. {row['Prénom']} {row['Nom']}: {row['Moyenne générale']:.2f}/20\n")
-            
-            self.resultats.insert(tk.END, f"\nMoyenne de la promotion: {df['Moyenne générale'].mean():.2f}/20\n")
-
-def extraire_notes_from_txt(texte):
-    notes = {}
-    
-    # Motif pour trouver les lignes avec des notes
-    # Format: nombre (coeff nombre)
-    pattern = r'(\d+[.,]\d+)\s*\(coeff\s*(\d+[.,]\d+)\)'
-    
-    # Trouver la matière actuelle
-    matiere_pattern = r'Code ECUE TBFTR(\d{3})'
-    
-    matiere_courante = None
-    
-    for ligne in texte.split('\n'):
-        # Chercher si c'est une nouvelle matière
-        matiere_match = re.search(matiere_pattern, ligne)
-        if matiere_match:
-            # Convertir R3.301 en R3.01, R3.302 en R3.02, etc.
-            num_matiere = matiere_match.group(1)
-            matiere_courante = f"R3.{int(num_matiere):02d}"
-        
-        # Chercher les notes et coefficients
-        if matiere_courante:
-            notes_matches = re.finditer(pattern, ligne)
-            for match in notes_matches:
-                note = float(match.group(1).replace(',', '.'))
-                coeff = float(match.group(2).replace(',', '.'))
-                
-                if matiere_courante not in notes:
-                    notes[matiere_courante] = []
-                notes[matiere_courante].append((note, coeff))
-    
-    # Traiter la SAE séparément (format différent)
-    sae_pattern = r'TBFTE301.*?(\d+[.,]\d+)\s*\(coeff\s*(\d+[.,]\d+)\)'
-    sae_match = re.search(sae_pattern, texte, re.DOTALL)
-    if sae_match:
-        note = float(sae_match.group(1).replace(',', '.'))
-        coeff = float(sae_match.group(2).replace(',', '.'))
-        notes['SAE3.01'] = [(note, coeff)]
-    
-    return notes
-
-def pdf_to_text(pdf_path):
-    try:
-        with open(pdf_path, 'rb') as file:
-            pdf_reader = PdfReader(file)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-            return text
-    except Exception as e:
-        messagebox.showerror("Erreur", f"Erreur lors de la lecture du PDF : {str(e)}")
-        return None
+            self.resultats.insert(tk.END, self.classement.resume())
 
 if __name__ == "__main__":
     root = tk.Tk()
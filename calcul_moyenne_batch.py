@@ -0,0 +1,151 @@
+# Mode batch sans interface graphique
+# Exemple: python calcul_moyenne_batch.py releves/ -o resultats.csv
+# Les relevés déjà convertis en texte (.txt ou .tar, voir archive_textes) sont
+# acceptés comme sources, seuls ou avec des PDF
+import os
+import sys
+import logging
+import argparse
+from contextlib import nullcontext
+from datetime import datetime
+from moteur_calcul import (lister_releves, traiter_lot_par_semestre, classer_resultats,
+                           resume_classement)
+from modele_coeffs import CHEMIN_DEFAUT as MODELE_DEFAUT, PROGRAMME_DEFAUT, ErreurModele
+from export_resultats import (ECRIVAINS, EXTENSIONS, ErreurExport, ecrire_resultats,
+                              format_du_fichier, verifier_format)
+from cache_extraction import CacheExtraction, CHEMIN_DEFAUT
+from moteurs_pdf import moteurs_disponibles
+from archive_textes import est_archive, lire_archive, ErreurArchive
+from instrumentation import Mesures, SANS_MESURE, profilage
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Calcule les moyennes UE d'une promotion à partir des relevés PDF "
+                    "et écrit le classement (CSV, XLSX, Parquet ou Feather).")
+    parser.add_argument('sources', nargs='+',
+                        help="Fichiers PDF, dossiers contenant des Releve-*.pdf, motifs glob "
+                             "ou archives de relevés en texte (.txt, .tar)")
+    parser.add_argument('-o', '--sortie',
+                        help="Fichier de sortie (par défaut resultats_promotion_<date>.<format>)")
+    parser.add_argument('-f', '--format', choices=sorted(ECRIVAINS),
+                        help="Format de sortie : csv, parquet, feather (pyarrow requis) ou xlsx "
+                             "(par défaut déduit de l'extension de --sortie, csv sans --sortie)")
+    parser.add_argument('--inclure-sae', action='store_true',
+                        help="Prendre en compte SAE3.01 (ignorée par défaut, comme dans l'interface)")
+    parser.add_argument('--modele', default=MODELE_DEFAUT,
+                        help="Fichier des coefficients, JSON ou TOML (par défaut %(default)s)")
+    parser.add_argument('--programme', default=PROGRAMME_DEFAUT,
+                        help="Programme du fichier de coefficients (par défaut %(default)s)")
+    parser.add_argument('--semestre',
+                        help="Semestre de tous les relevés (par défaut déduit de chaque relevé ; "
+                             "un fichier de sortie par semestre si le lot en mélange plusieurs)")
+    parser.add_argument('--moteur-pdf', default='pypdf2', choices=moteurs_disponibles(),
+                        help="Moteur de lecture des PDF ; un relevé que le moteur choisi lit mal "
+                             "est relu avec pypdf2 (par défaut %(default)s)")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="Nombre de processus de lecture en parallèle (par défaut: nombre de cœurs)")
+    parser.add_argument('--cache', default=CHEMIN_DEFAUT,
+                        help="Cache des notes déjà extraites (par défaut %(default)s)")
+    parser.add_argument('--sans-cache', action='store_true',
+                        help="Relire tous les PDF sans consulter ni remplir le cache")
+    parser.add_argument('-v', '--verbose', action='count', default=0,
+                        help="-v: infos de profilage, -vv: messages de débogage")
+    mesure = parser.add_argument_group("mesures")
+    mesure.add_argument('--mesures', action='store_true',
+                        help="Afficher la durée de chaque étape et les compteurs")
+    mesure.add_argument('--trace', metavar='JSON',
+                        help="Écrire les étapes au format Chrome trace (chrome://tracing)")
+    mesure.add_argument('--journal-mesures', metavar='JSONL',
+                        help="Écrire les étapes et compteurs en JSON, un événement par ligne")
+    mesure.add_argument('--profil', metavar='FICHIER',
+                        help="Profiler le processus principal avec cProfile")
+    mesure.add_argument('--tracemalloc', action='store_true',
+                        help="Mesurer le pic de mémoire allouée par le processus principal")
+    args = parser.parse_args(argv)
+
+    # Format vérifié avant de lire le moindre relevé : une extension inconnue
+    # ou pyarrow absent ne doivent pas se découvrir à la fin du traitement
+    if args.sortie and not args.format and format_du_fichier(args.sortie, defaut=None) is None:
+        print(f"{args.sortie}: extension inconnue (attendu {', '.join(sorted(EXTENSIONS))}), "
+              f"préciser le format avec -f", file=sys.stderr)
+        return 1
+    format_sortie = args.format or (format_du_fichier(args.sortie) if args.sortie else 'csv')
+    try:
+        verifier_format(format_sortie)
+    except ErreurExport as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    logging.basicConfig(level=[logging.WARNING, logging.INFO, logging.DEBUG][min(args.verbose, 2)],
+                        format='%(message)s')
+    mesurer = args.mesures or args.trace or args.journal_mesures or args.profil or args.tracemalloc
+    mesures = Mesures() if mesurer else None
+
+    archives = [source for source in args.sources if est_archive(source)]
+    pdf_paths = lister_releves([source for source in args.sources if source not in archives])
+    if not pdf_paths and not archives:
+        print("Aucun relevé trouvé.", file=sys.stderr)
+        return 1
+
+    ouverture_cache = nullcontext() if args.sans_cache else CacheExtraction(args.cache)
+    try:
+        with ouverture_cache as cache, profilage(mesures or SANS_MESURE, args.profil,
+                                                 args.tracemalloc):
+            releves, erreurs_archives = [], []
+            with (mesures or SANS_MESURE).etape('lecture_archives'):
+                for archive in archives:
+                    releves_archive, erreurs_archive = lire_archive(archive, mesures or SANS_MESURE)
+                    releves.extend(releves_archive)
+                    erreurs_archives.extend(erreurs_archive)
+            par_semestre, erreurs = traiter_lot_par_semestre(
+                pdf_paths, ignore_sae=not args.inclure_sae, workers=args.workers, cache=cache,
+                mesures=mesures, chemin_modele=args.modele, programme=args.programme,
+                semestre=args.semestre, moteur=args.moteur_pdf, releves=releves)
+    except (ErreurModele, ErreurArchive) as e:
+        print(e, file=sys.stderr)
+        return 1
+    for pdf_path, message in erreurs_archives + erreurs:
+        print(f"{pdf_path}: {message}", file=sys.stderr)
+
+    if not any(par_semestre.values()):
+        print("Aucun relevé n'a pu être traité.", file=sys.stderr)
+        return 1
+
+    sortie = args.sortie or (f"resultats_promotion_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+                             f".{format_sortie}")
+    sorties = []
+    with (mesures or SANS_MESURE).etape('export'):
+        for semestre, resultats in par_semestre.items():
+            df = classer_resultats(resultats)
+            # Un fichier par semestre quand le lot en contient plusieurs
+            if len(par_semestre) > 1:
+                racine, extension = os.path.splitext(sortie)
+                sortie_semestre = f"{racine}_{semestre}{extension}"
+            else:
+                sortie_semestre = sortie
+            try:
+                ecrire_resultats(df, sortie_semestre, format_sortie)
+            except ErreurExport as e:
+                print(e, file=sys.stderr)
+                return 1
+            sorties.append((semestre, df, sortie_semestre))
+
+    if mesures:
+        if args.mesures:
+            print(mesures.resume(), file=sys.stderr)
+        if args.trace:
+            mesures.exporter_chrome_trace(args.trace)
+        if args.journal_mesures:
+            mesures.exporter_journal(args.journal_mesures)
+
+    for semestre, df, sortie_semestre in sorties:
+        if len(sorties) > 1:
+            print(f"\n{args.programme} {semestre}")
+        print(resume_classement(df), end='')
+        print(f"\nFichier généré : {sortie_semestre}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
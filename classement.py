@@ -0,0 +1,212 @@
+# Classement d'une promotion gardé en mémoire entre deux modifications
+# Les moyennes par ressource de chaque étudiant sont calculées une fois ; changer
+# un coefficient ou l'option SAE ne recalcule que les UE concernées, puis les
+# moyennes générales et le rang.
+# Un étudiant peut aussi être ajouté, remplacé ou retiré (mode surveillance) :
+# seule sa ligne est calculée et le rang est mis à jour par insertion. Comme
+# dans stockage_resultats, les tableaux sont réservés par capacité doublée :
+# moyennes_ressources, moyennes_ue et moyennes_generales sont des vues sur les
+# lignes occupées, un ajout ne recopie pas toute la promotion.
+import bisect
+import numpy as np
+from matieres_coeffs import MODELE_DEFAUT
+from moteur_calcul import (COLONNES_TETE, calculer_moyennes_promotion, calculer_moyenne_ue,
+                           calculer_moyennes_generales, lignes_resume, rangs_extremes)
+
+
+class ClassementPromotion:
+    def __init__(self, noms, liste_notes, coeffs=None, ignore_sae=True, modele=MODELE_DEFAUT):
+        # noms: dictionnaires {'nom', 'prenom'} de extraire_nom_prenom, dans
+        # l'ordre de liste_notes
+        # modele (modele_coeffs.ModeleCoefficients) donne les matières, la SAE
+        # et, sauf si coeffs est fourni, les coefficients de départ
+        self.noms = list(noms)
+        self.modele = modele
+        self.sae = modele.sae
+        if coeffs is None:
+            coeffs = modele.coeffs
+        self.coeffs = {ue: dict(matieres_coeffs) for ue, matieres_coeffs in coeffs.items()}
+        self.ignore_sae = ignore_sae
+
+        # Toutes les matières connues ont une colonne, SAE comprise, pour
+        # pouvoir les ajouter à une UE plus tard sans relire les notes
+        matieres = list(dict.fromkeys(
+            [m for matieres_coeffs in self.coeffs.values() for m in matieres_coeffs] + modele.matieres))
+        _, self.matieres, _, _, self.moyennes_ressources = calculer_moyennes_promotion(
+            liste_notes, ignore_sae=False, coeffs=self.coeffs, matieres=matieres, modele=modele)
+        self.index_matiere = {m: j for j, m in enumerate(self.matieres)}
+
+        self.ues = list(self.coeffs)
+        capacite = max(len(self.noms), 64)
+        self._ressources = self._tampon(self.moyennes_ressources, capacite)
+        self._ue = np.full((capacite, len(self.ues)), np.nan)
+        self._generales = np.full(capacite, np.nan)
+        self._vues()
+        for u in range(len(self.ues)):
+            self._recalculer_ue(u)
+        self._recalculer_generales()
+
+    def __len__(self):
+        return len(self.noms)
+
+    @staticmethod
+    def _tampon(tableau, capacite):
+        # Copie de tableau en tête d'un tableau de capacite lignes (NaN au-delà)
+        tampon = np.full((capacite,) + tableau.shape[1:], np.nan)
+        tampon[:len(tableau)] = tableau
+        return tampon
+
+    def _vues(self):
+        n = len(self.noms)
+        self.moyennes_ressources = self._ressources[:n]
+        self.moyennes_ue = self._ue[:n]
+        self.moyennes_generales = self._generales[:n]
+
+    def _reserver(self, nb_lignes):
+        capacite = self._generales.shape[0]
+        if len(self.noms) + nb_lignes <= capacite:
+            return
+        while capacite < len(self.noms) + nb_lignes:
+            capacite *= 2
+        self._ressources = self._tampon(self.moyennes_ressources, capacite)
+        self._ue = self._tampon(self.moyennes_ue, capacite)
+        self._generales = self._tampon(self.moyennes_generales, capacite)
+
+    def _moyennes_ressources(self, liste_notes):
+        return calculer_moyennes_promotion(liste_notes, ignore_sae=False, coeffs=self.coeffs,
+                                           matieres=self.matieres, modele=self.modele)[4]
+
+    def _moyennes_ue(self, moyennes_ressources):
+        return np.column_stack(
+            [calculer_moyenne_ue(moyennes_ressources, self.index_matiere, self.coeffs[ue],
+                                 self.ignore_sae, self.sae) for ue in self.ues])
+
+    def _cle(self, i):
+        # Clé de tri de l'étudiant i, même ordre que ordre()
+        g = self.moyennes_generales[i]
+        return (0, -g, i) if g == g else (1, 0.0, i)
+
+    def ajouter(self, nom, notes):
+        # Ajoute un étudiant à la fin (dernier en cas d'ex aequo), retourne son indice
+        i = len(self.noms)
+        self._reserver(1)
+        ressources = self._moyennes_ressources([notes])
+        moyennes_ue = self._moyennes_ue(ressources)
+        self._ressources[i] = ressources[0]
+        self._ue[i] = moyennes_ue[0]
+        self._generales[i] = calculer_moyennes_generales(moyennes_ue)[0]
+        self.noms.append(nom)
+        self._vues()
+        if self._cles is not None:
+            bisect.insort(self._cles, self._cle(i))
+            self._ordre = None
+        return i
+
+    def remplacer(self, i, nom, notes):
+        # Nouvelles notes pour l'étudiant i, qui garde sa place parmi les ex aequo
+        if self._cles is not None:
+            del self._cles[bisect.bisect_left(self._cles, self._cle(i))]
+        self.noms[i] = nom
+        self.moyennes_ressources[i] = self._moyennes_ressources([notes])[0]
+        self.moyennes_ue[i] = self._moyennes_ue(self.moyennes_ressources[i:i + 1])[0]
+        self.moyennes_generales[i] = calculer_moyennes_generales(self.moyennes_ue[i:i + 1])[0]
+        if self._cles is not None:
+            bisect.insort(self._cles, self._cle(i))
+            self._ordre = None
+
+    def retirer(self, i):
+        # Les étudiants suivants prennent l'indice i, i + 1, ... : le rang est
+        # recalculé entièrement au prochain ordre()
+        n = len(self.noms)
+        for tampon in (self._ressources, self._ue, self._generales):
+            tampon[i:n - 1] = tampon[i + 1:n]
+            tampon[n - 1] = np.nan
+        del self.noms[i]
+        self._vues()
+        self._cles = self._ordre = None
+
+    def changer_coefficient(self, ue, matiere, coeff):
+        # coeff None retire la matière de l'UE ; une UE inconnue est créée
+        if matiere not in self.index_matiere:
+            raise KeyError(f"Matière inconnue : {matiere}")
+        if ue not in self.coeffs:
+            self.coeffs[ue] = {}
+            self.ues.append(ue)
+            self._ue = np.column_stack([self._ue, np.full(self._ue.shape[0], np.nan)])
+            self._vues()
+        if coeff is None:
+            self.coeffs[ue].pop(matiere, None)
+        else:
+            self.coeffs[ue][matiere] = coeff
+        self._recalculer_ue(self.ues.index(ue))
+        self._recalculer_generales()
+
+    def changer_ignore_sae(self, ignore_sae):
+        if ignore_sae == self.ignore_sae:
+            return
+        self.ignore_sae = ignore_sae
+        for u, ue in enumerate(self.ues):
+            if self.sae in self.coeffs[ue]:
+                self._recalculer_ue(u)
+        self._recalculer_generales()
+
+    def _recalculer_ue(self, u):
+        self.moyennes_ue[:, u] = calculer_moyenne_ue(
+            self.moyennes_ressources, self.index_matiere, self.coeffs[self.ues[u]],
+            self.ignore_sae, self.sae)
+
+    def _recalculer_generales(self):
+        self.moyennes_generales[:] = calculer_moyennes_generales(self.moyennes_ue)
+        self._cles = self._ordre = None
+
+    def ordre(self):
+        # Indices des étudiants du premier au dernier, sans moyenne à la fin,
+        # ex aequo dans l'ordre des relevés
+        # Les clés triées sont gardées pour que ajouter et remplacer n'aient
+        # qu'à insérer la clé de l'étudiant modifié
+        if self._cles is None:
+            self._cles = sorted(self._cle(i) for i in range(len(self.noms)))
+        if self._ordre is None:
+            self._ordre = np.fromiter((cle[2] for cle in self._cles), dtype=np.intp,
+                                      count=len(self._cles))
+        return self._ordre
+
+    def ressources_affichees(self):
+        # Ressources d'au moins une UE (hors SAE ignorée), dans l'ordre de coeffs
+        matieres = dict.fromkeys(m for matieres_coeffs in self.coeffs.values()
+                                 for m in matieres_coeffs)
+        if self.ignore_sae:
+            matieres.pop(self.sae, None)
+        return list(matieres)
+
+    def dataframe(self):
+        # Même tableau que classer_resultats : trié, avec le rang, colonnes
+        # Nom, Prénom, Rang, Moyenne générale, UE puis ressources notées
+        import pandas as pd
+        ordre = self.ordre()
+        colonnes = {
+            'Nom': [self.noms[i]['nom'] for i in ordre],
+            'Prénom': [self.noms[i]['prenom'] for i in ordre],
+            'Rang': np.arange(1, len(ordre) + 1),
+            'Moyenne générale': self.moyennes_generales[ordre],
+        }
+        for u, ue in enumerate(self.ues):
+            colonnes[ue] = self.moyennes_ue[ordre, u]
+        for matiere in self.ressources_affichees():
+            moyennes = self.moyennes_ressources[ordre, self.index_matiere[matiere]]
+            if not np.isnan(moyennes).all():
+                colonnes[matiere] = moyennes
+        df = pd.DataFrame(colonnes, index=ordre)
+        return df[COLONNES_TETE + [c for c in df.columns if c not in COLONNES_TETE]]
+
+    def resume(self):
+        # Même texte que resume_classement, sans construire le tableau ni trier
+        premiers, derniers = rangs_extremes(self.moyennes_generales)
+
+        def lignes(rangs):
+            return [(rang, self.noms[i]['prenom'], self.noms[i]['nom'],
+                     self.moyennes_generales[i]) for rang, i in rangs]
+
+        valides = self.moyennes_generales[~np.isnan(self.moyennes_generales)]
+        moyenne = valides.mean() if len(valides) else float('nan')
+        return lignes_resume(len(self.noms), lignes(premiers), lignes(derniers), moyenne)
@@ -0,0 +1,67 @@
+# Vérification des modules nécessaires, à lancer explicitement (elle n'est plus
+# faite à chaque démarrage de l'interface)
+# python dependances.py              : liste les modules manquants
+# python dependances.py --installer  : installe les modules requis manquants avec pip
+import sys
+import argparse
+import subprocess
+import importlib.util
+
+# tkinter est généralement inclus avec Python, il ne s'installe pas via pip
+REQUIS = ['PyPDF2', 'pandas', 'numpy']
+OPTIONNELS = {
+    'pyarrow': "export Parquet et Feather",
+    'inotify_simple': "surveillance d'un dossier sans attente, sous Linux",
+    'pypdfium2': "moteur de lecture PDF --moteur-pdf pypdfium2",
+    'pdfminer': "moteur de lecture PDF --moteur-pdf pdfminer (paquet pdfminer.six)",
+}
+# Nom du paquet pip quand il diffère du nom du module (le paquet "pdfminer"
+# est l'ancienne version abandonnée)
+PAQUETS_PIP = {'pdfminer': 'pdfminer.six'}
+
+
+def modules_manquants(noms):
+    # find_spec ne charge pas le module, la vérification reste rapide
+    return [nom for nom in noms if importlib.util.find_spec(nom) is None]
+
+
+def check_and_install_packages(packages=REQUIS):
+    for package in modules_manquants(packages):
+        print(f"Installation du module {package}...")
+        try:
+            subprocess.check_call([sys.executable, '-m', 'pip', 'install',
+                                   PAQUETS_PIP.get(package, package)])
+            print(f"{package} a été installé avec succès!")
+        except subprocess.CalledProcessError as e:
+            print(f"Erreur lors de l'installation de {package}: {e}")
+            sys.exit(1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vérifie les modules Python nécessaires.")
+    parser.add_argument('--installer', action='store_true',
+                        help="Installer avec pip les modules requis manquants")
+    parser.add_argument('--optionnels', action='store_true',
+                        help="Avec --installer, installer aussi les modules optionnels")
+    args = parser.parse_args(argv)
+
+    if importlib.util.find_spec('tkinter') is None:
+        print("tkinter manquant : nécessaire pour l'interface graphique (paquet python3-tk)")
+    if args.installer:
+        check_and_install_packages(REQUIS + (list(OPTIONNELS) if args.optionnels else []))
+        return 0
+
+    manquants = modules_manquants(REQUIS)
+    for nom in manquants:
+        print(f"{nom} manquant (requis)")
+    for nom in modules_manquants(OPTIONNELS):
+        print(f"{nom} manquant (optionnel : {OPTIONNELS[nom]})")
+    if manquants:
+        print("Pour installer les modules requis : python dependances.py --installer")
+        return 1
+    print("Tous les modules requis sont installés.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+# Écriture du classement dans les différents formats de sortie
+# CSV (séparateur ';', virgule décimale, comme avant), Parquet et Feather pour
+# les tableaux de bord (pyarrow, optionnel) et XLSX écrit ligne par ligne sans
+# dépendance supplémentaire
+import os
+import math
+import zipfile
+from xml.sax.saxutils import escape
+
+
+class ErreurExport(Exception):
+    pass
+
+
+def ecrire_csv(df, file_path):
+    df.to_csv(file_path, index=False, sep=';', decimal=',')
+
+
+def _verifier_pyarrow(format_sortie):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ErreurExport(f"Le format {format_sortie} nécessite pyarrow (pip install pyarrow)")
+
+
+def ecrire_parquet(df, file_path):
+    _verifier_pyarrow('Parquet')
+    df.to_parquet(file_path, index=False)
+
+
+def ecrire_feather(df, file_path):
+    # Feather n'accepte qu'un index par défaut
+    _verifier_pyarrow('Feather')
+    df.reset_index(drop=True).to_feather(file_path)
+
+
+# Parties fixes d'un classeur XLSX à une seule feuille
+_XLSX_FIXES = {
+    '[Content_Types].xml':
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>',
+    '_rels/.rels':
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>',
+    'xl/workbook.xml':
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Classement" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>',
+    'xl/_rels/workbook.xml.rels':
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>',
+}
+
+
+def _cellule_xlsx(valeur):
+    # Cellule sans référence (position implicite) ; vide pour une moyenne manquante
+    if isinstance(valeur, str):
+        return f'<c t="inlineStr"><is><t>{escape(valeur)}</t></is></c>'
+    if valeur is None or (isinstance(valeur, float) and math.isnan(valeur)):
+        return '<c/>'
+    return f'<c><v>{valeur!r}</v></c>'
+
+
+def ecrire_xlsx(df, file_path, lignes_par_bloc=1000):
+    # La feuille est écrite dans l'archive au fur et à mesure, par blocs de
+    # lignes, sans garder tout le XML en mémoire
+    with zipfile.ZipFile(file_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for nom, contenu in _XLSX_FIXES.items():
+            archive.writestr(nom, contenu)
+        with archive.open('xl/worksheets/sheet1.xml', 'w') as feuille:
+            feuille.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                          b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                          b'<sheetData>')
+            entete = ''.join(_cellule_xlsx(str(c)) for c in df.columns)
+            feuille.write(f'<row>{entete}</row>'.encode('utf-8'))
+            bloc = []
+            for ligne in df.itertuples(index=False, name=None):
+                bloc.append('<row>' + ''.join(_cellule_xlsx(
+                    v.item() if hasattr(v, 'item') else v) for v in ligne) + '</row>')
+                if len(bloc) >= lignes_par_bloc:
+                    feuille.write(''.join(bloc).encode('utf-8'))
+                    bloc = []
+            feuille.write(''.join(bloc).encode('utf-8'))
+            feuille.write(b'</sheetData></worksheet>')
+
+
+ECRIVAINS = {
+    'csv': ecrire_csv,
+    'parquet': ecrire_parquet,
+    'feather': ecrire_feather,
+    'xlsx': ecrire_xlsx,
+}
+
+EXTENSIONS = {'.csv': 'csv', '.parquet': 'parquet', '.feather': 'feather',
+              '.arrow': 'feather', '.xlsx': 'xlsx'}
+
+
+def format_du_fichier(file_path, defaut='csv'):
+    return EXTENSIONS.get(os.path.splitext(file_path)[1].lower(), defaut)
+
+
+def verifier_format(format_sortie):
+    # Lève ErreurExport si ce format ne peut pas être écrit ici, à appeler
+    # avant de commencer un traitement long
+    if format_sortie in ('parquet', 'feather'):
+        _verifier_pyarrow(format_sortie.capitalize())
+
+
+def ecrire_resultats(df, file_path, format_sortie=None):
+    # format_sortie: clé de ECRIVAINS, déduite de l'extension si absente
+    ECRIVAINS[format_sortie or format_du_fichier(file_path)](df, file_path)
@@ -0,0 +1,126 @@
+# Mesures du traitement batch : durée de chaque étape, compteurs, profilage
+# Une instance de Mesures est passée à traiter_lot_par_semestre ; sans instance, SANS_MESURE
+# est utilisé et ne coûte qu'un appel de fonction vide par étape.
+# Les étapes sont exportables en journal JSON (une ligne par événement) ou au
+# format Chrome trace (chrome://tracing, https://ui.perfetto.dev)
+import os
+import json
+import time
+import pstats
+import cProfile
+import logging
+import threading
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+journal = logging.getLogger('calcul_moyenne')
+
+
+class Mesures:
+    def __init__(self):
+        self.durees = {}        # étape -> durée totale en secondes
+        self.appels = {}        # étape -> nombre de passages
+        self.compteurs = {}     # nom -> valeur
+        self.evenements = []    # (étape, début, durée, pid, tid), temps en perf_counter
+
+    @contextmanager
+    def etape(self, nom):
+        debut = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.ajouter_etape(nom, debut, time.perf_counter() - debut)
+
+    def ajouter_etape(self, nom, debut, duree, pid=None, tid=None):
+        self.durees[nom] = self.durees.get(nom, 0.0) + duree
+        self.appels[nom] = self.appels.get(nom, 0) + 1
+        self.evenements.append((nom, debut, duree, pid or os.getpid(),
+                                tid or threading.get_ident()))
+
+    def compter(self, nom, valeur=1):
+        self.compteurs[nom] = self.compteurs.get(nom, 0) + valeur
+
+    def fusionner(self, autre):
+        # Ajoute les mesures faites dans un autre processus (voir etat())
+        for nom, debut, duree, pid, tid in autre['evenements']:
+            self.ajouter_etape(nom, debut, duree, pid, tid)
+        for nom, valeur in autre['compteurs'].items():
+            self.compter(nom, valeur)
+
+    def etat(self):
+        # Forme sérialisable, renvoyée par les processus du pool
+        return {'evenements': self.evenements, 'compteurs': self.compteurs}
+
+    def resume(self):
+        lignes = []
+        for nom, duree in sorted(self.durees.items(), key=lambda e: -e[1]):
+            lignes.append(f"{nom:24s} {duree:9.3f} s  ({self.appels[nom]} fois)")
+        for nom, valeur in sorted(self.compteurs.items()):
+            lignes.append(f"{nom:24s} {valeur}")
+        return "\n".join(lignes)
+
+    def exporter_journal(self, chemin):
+        # Une ligne JSON par étape mesurée, puis une ligne par compteur
+        with open(chemin, 'w', encoding='utf-8') as f:
+            for nom, debut, duree, pid, tid in self.evenements:
+                f.write(json.dumps({'etape': nom, 'debut_s': debut, 'duree_s': duree,
+                                    'pid': pid, 'tid': tid}) + "\n")
+            for nom, valeur in self.compteurs.items():
+                f.write(json.dumps({'compteur': nom, 'valeur': valeur}) + "\n")
+
+    def exporter_chrome_trace(self, chemin):
+        # perf_counter est monotone et commun aux processus sous Linux, les
+        # étapes des processus du pool s'alignent donc sur celles du parent
+        evenements = [{'name': nom, 'cat': 'batch', 'ph': 'X', 'ts': debut * 1e6,
+                       'dur': duree * 1e6, 'pid': pid, 'tid': tid}
+                      for nom, debut, duree, pid, tid in self.evenements]
+        if self.evenements:
+            fin = max(debut + duree for _, debut, duree, _, _ in self.evenements)
+            evenements.append({'name': 'compteurs', 'ph': 'C', 'ts': fin * 1e6,
+                               'pid': os.getpid(), 'args': self.compteurs})
+        with open(chemin, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': evenements, 'displayTimeUnit': 'ms'}, f)
+
+
+class _SansMesure:
+    # Même interface que Mesures, ne fait rien
+    def etape(self, nom):
+        return nullcontext()
+
+    def ajouter_etape(self, *args, **kwargs):
+        pass
+
+    def compter(self, nom, valeur=1):
+        pass
+
+    def fusionner(self, autre):
+        pass
+
+
+SANS_MESURE = _SansMesure()
+
+
+@contextmanager
+def profilage(mesures=SANS_MESURE, fichier_profil=None, memoire=False):
+    # cProfile (écrit dans fichier_profil) et/ou tracemalloc autour d'un bloc
+    # Seul le processus courant est profilé, pas les processus du pool
+    profil = cProfile.Profile() if fichier_profil else None
+    if memoire:
+        tracemalloc.start()
+    if profil:
+        profil.enable()
+    try:
+        yield
+    finally:
+        if profil:
+            profil.disable()
+            profil.dump_stats(fichier_profil)
+            if journal.isEnabledFor(logging.INFO):
+                journal.info("Profil écrit dans %s", fichier_profil)
+                pstats.Stats(profil).sort_stats('cumulative').print_stats(15)
+        if memoire:
+            _, pic = tracemalloc.get_traced_memory()
+            mesures.compter('memoire_pic_octets', pic)
+            for stat in tracemalloc.take_snapshot().statistics('lineno')[:10]:
+                journal.info("allocation: %s", stat)
+            tracemalloc.stop()
@@ -1,22 +1,12 @@
+# Matières et coefficients par UE du semestre par défaut
+# Les valeurs sont dans coefficients.json (voir modele_coeffs pour les autres
+# semestres et programmes) ; ces noms restent pour le code qui les importe
+from modele_coeffs import modele
+
+MODELE_DEFAUT = modele()
+
 # Matières disponibles pour le calcul des moyennes
-MATIERES = [
-    'R3.01', 'R3.02', 'R3.03', 'R3.04', 'R3.05', 'R3.06', 'R3.07',
-    'R3.08', 'R3.09', 'R3.10', 'R3.11', 'R3.12', 'R3.13', 'R3.14',
-    'SAE3.01', 'SAE3.Portfolio'
-]
+MATIERES = MODELE_DEFAUT.matieres
 
 # Coefficients par UE
-COEFFICIENTS = {
-    'UE31': {'R3.01': 15.00, 'R3.02': 10.00, 'R3.03': 12.00, 'R3.04': 15.00,
-             'R3.11': 8.00, 'SAE3.01': 40.00},
-    'UE32': {'R3.01': 5.00, 'R3.02': 13.00, 'R3.03': 5.00, 'R3.06': 5.00,
-             'R3.08': 17.00, 'R3.09': 10.00, 'R3.12': 5.00, 'SAE3.01': 40.00},
-    'UE33': {'R3.01': 5.00, 'R3.05': 22.00, 'R3.06': 18.00, 'R3.09': 10.00,
-             'R3.12': 5.00, 'SAE3.01': 40.00},
-    'UE34': {'R3.01': 10.00, 'R3.07': 25.00, 'R3.08': 5.00, 'R3.09': 5.00,
-             'R3.10': 10.00, 'R3.11': 5.00, 'SAE3.01': 40.00},
-    'UE35': {'R3.03': 10.00, 'R3.04': 8.00, 'R3.10': 18.00, 'R3.11': 10.00,
-             'R3.12': 7.00, 'R3.13': 7.00, 'SAE3.01': 40.00},
-    'UE36': {'R3.04': 5.00, 'R3.12': 8.00, 'R3.13': 16.00, 'R3.14': 15.00,
-             'SAE3.01': 40.00}
-} 
\ No newline at end of file
+COEFFICIENTS = MODELE_DEFAUT.coeffs
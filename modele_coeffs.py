@@ -0,0 +1,114 @@
+# Modèle de coefficients lu dans un fichier de données (JSON, ou TOML avec Python 3.11+)
+# Le fichier décrit, par programme et par semestre, les matières, la SAE et les
+# coefficients de chaque UE (voir coefficients.json). Chaque semestre est compilé
+# une fois au chargement : correspondance clé du relevé -> matière et en-têtes
+# ECUE attendus. Les modèles compilés sont gardés par version du fichier
+# (empreinte de son contenu) : le relire ne recompile rien tant qu'il n'a pas changé.
+import os
+import json
+import hashlib
+from collections import Counter
+
+CHEMIN_DEFAUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'coefficients.json')
+PROGRAMME_DEFAUT = 'TBF'
+SEMESTRE_DEFAUT = 'S3'
+
+
+class ErreurModele(Exception):
+    pass
+
+
+class ModeleCoefficients:
+    def __init__(self, programme, semestre, matieres, coefficients, sae=None, version=''):
+        self.programme = programme
+        self.semestre = semestre
+        self.version = version
+        self.matieres = list(matieres)
+        self.coeffs = {ue: dict(matieres_coeffs) for ue, matieres_coeffs in coefficients.items()}
+        self.ues = list(self.coeffs)
+        self.sae = sae
+
+        inconnues = {m for matieres_coeffs in self.coeffs.values() for m in matieres_coeffs
+                     if m not in self.matieres}
+        if inconnues:
+            raise ErreurModele(f"{programme} {semestre} : matières sans déclaration "
+                               f"{', '.join(sorted(inconnues))}")
+
+        # L'extracteur nomme chaque ressource R3.<code ECUE à 3 chiffres> quel
+        # que soit le semestre (R3.301, R3.105...) et la SAE par son nom
+        numero = int(semestre.lstrip('Ss'))
+        self.matiere_de_cle = {}
+        ecue = []
+        for matiere in self.matieres:
+            if matiere == sae:
+                self.matiere_de_cle[matiere] = matiere
+                continue
+            prefixe, _, rang = matiere.partition('.')
+            if prefixe.startswith('R') and rang.isdigit():
+                code = numero * 100 + int(rang)
+                self.matiere_de_cle[f"R3.{code}"] = matiere
+                ecue.append(code)
+        # En-têtes "Code ECUE" attendus sur un relevé complet (arrêt anticipé)
+        self.ecue_attendus = frozenset(ecue)
+
+    def __repr__(self):
+        return f"<ModeleCoefficients {self.programme} {self.semestre} v{self.version}>"
+
+
+def _lire(donnees, chemin):
+    if chemin.endswith('.toml'):
+        try:
+            import tomllib
+        except ImportError:
+            raise ErreurModele("Les modèles TOML nécessitent Python 3.11 ou plus récent")
+        return tomllib.loads(donnees.decode('utf-8'))
+    return json.loads(donnees)
+
+
+# (chemin absolu, empreinte du contenu) -> {(programme, semestre): ModeleCoefficients}
+_modeles_compiles = {}
+
+
+def charger_modeles(chemin=None):
+    # Tous les semestres du fichier, compilés ; le fichier est relu à chaque
+    # appel mais compilé seulement à la première lecture de chaque version
+    chemin = os.path.abspath(chemin or CHEMIN_DEFAUT)
+    try:
+        with open(chemin, 'rb') as f:
+            donnees = f.read()
+    except OSError as e:
+        raise ErreurModele(f"Modèle de coefficients illisible : {e}") from e
+    cle = (chemin, hashlib.sha256(donnees).hexdigest())
+    modeles = _modeles_compiles.get(cle)
+    if modeles is None:
+        try:
+            contenu = _lire(donnees, chemin)
+            version = f"{contenu.get('version', 0)}-{cle[1][:12]}"
+            modeles = {
+                (programme, semestre): ModeleCoefficients(
+                    programme, semestre, description['matieres'],
+                    description['coefficients'], description.get('sae'), version)
+                for programme, semestres in contenu['programmes'].items()
+                for semestre, description in semestres.items()
+            }
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            raise ErreurModele(f"Modèle de coefficients invalide ({chemin}) : {e!r}") from e
+        _modeles_compiles[cle] = modeles
+    return modeles
+
+
+def modele(semestre=SEMESTRE_DEFAUT, programme=PROGRAMME_DEFAUT, chemin=None):
+    modeles = charger_modeles(chemin)
+    try:
+        return modeles[(programme, semestre)]
+    except KeyError:
+        disponibles = ', '.join(f"{p} {s}" for p, s in sorted(modeles))
+        raise ErreurModele(f"Pas de coefficients pour {programme} {semestre} "
+                           f"(disponibles : {disponibles})") from None
+
+
+def semestre_des_notes(notes_par_matiere):
+    # Semestre des codes ECUE d'un relevé (R3.105 -> S1), None s'il n'en a pas
+    semestres = Counter(cle[3] for cle in notes_par_matiere
+                        if cle.startswith('R3.') and len(cle) == 6)
+    return f"S{semestres.most_common(1)[0][0]}" if semestres else None
@@ -0,0 +1,754 @@
+# Moteur de calcul des moyennes, sans dépendance à Tkinter
+# Utilisé par l'interface graphique (calcul_moyenne.py) et par le mode
+# ligne de commande (calcul_moyenne_batch.py)
+# PyPDF2 et pandas ne sont importés qu'à la première lecture de PDF ou au
+# premier tableau construit, pour que l'interface démarre sans les charger
+# Le texte des PDF est lu par un des moteurs de moteurs_pdf (pypdf2 par défaut)
+import re
+import os
+import glob
+import math
+import heapq
+import hashlib
+import functools
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from matieres_coeffs import MODELE_DEFAUT
+from modele_coeffs import PROGRAMME_DEFAUT, SEMESTRE_DEFAUT, charger_modeles, semestre_des_notes
+from instrumentation import journal, Mesures, SANS_MESURE
+from moteurs_pdf import MOTEURS, ErreurMoteurPDF
+from stockage_resultats import ResultatsPromotion
+
+# Colonnes placées en tête du CSV, dans cet ordre
+COLONNES_TETE = ['Nom', 'Prénom', 'Rang', 'Moyenne générale']
+
+# À incrémenter à chaque changement de pdf_to_text ou extraire_notes_from_txt
+# qui modifie les notes extraites : les entrées du cache d'extraction
+# enregistrées avec une autre version sont alors ignorées
+VERSION_EXTRACTEUR = 3
+
+# Numéros des en-têtes "Code ECUE TBFTRxxx" des ressources du semestre par défaut (301 à 314) :
+# une fois tous vus, avec la note de SAE, la lecture du PDF peut s'arrêter
+ECUE_ATTENDUS = MODELE_DEFAUT.ecue_attendus
+
+
+class TraitementAnnule(Exception):
+    pass
+
+
+class ErreurLecturePDF(Exception):
+    pass
+
+
+def empreinte_fichier(chemin):
+    # SHA-256 du contenu, sert de clé au cache d'extraction
+    h = hashlib.sha256()
+    with open(chemin, 'rb') as f:
+        for bloc in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(bloc)
+    return h.hexdigest()
+
+
+MOTEUR_PDF_DEFAUT = 'pypdf2'
+
+
+def pages_pdf(pdf_path, moteur=MOTEUR_PDF_DEFAUT):
+    # Texte de chaque page, extrait seulement quand on le demande
+    # ErreurMoteurPDF (document que le moteur ne sait pas lire) passe telle quelle
+    try:
+        yield from MOTEURS[moteur](pdf_path)
+    except ErreurMoteurPDF:
+        raise
+    except ImportError as e:
+        raise ErreurLecturePDF(f"{e.name or moteur} n'est pas installé "
+                               f"(python dependances.py --installer)") from e
+    except Exception as e:
+        raise ErreurLecturePDF(f"Erreur lors de la lecture du PDF : {str(e)}") from e
+
+
+def pdf_to_text(pdf_path, moteur=MOTEUR_PDF_DEFAUT):
+    return "".join(texte + "\n" for texte in pages_pdf(pdf_path, moteur))
+
+
+# Jetons reconnus en une seule passe sur le texte d'un relevé :
+# - en-tête de ressource "Code ECUE TBFTR301" (le numéro est lu sans être consommé,
+#   une note collée au code reste visible comme dans l'ancienne lecture ligne à ligne)
+# - début du bloc SAE "TBFTE301"
+# - note au format "12,50 (coeff 1,00)"
+# Le test de tête (?=[\dCT]) écarte vite les positions qui ne peuvent rien donner
+_JETONS = re.compile(
+    r'(?=[\dCT])(?:'
+    r'(\d+[.,]\d+)\s*\(coeff\s*(\d+[.,]\d+)\)'
+    r'|Code ECUE TBFTR(?=(\d{3}))'
+    r'|(TBFTE)(?=301))')
+# Valeurs de lastindex pour chaque genre de jeton
+_JETON_NOTE, _JETON_ECUE, _JETON_SAE = 2, 3, 4
+_NOTE = re.compile(r'(\d+[.,]\d+)\s*\(coeff\s*(\d+[.,]\d+)\)')
+
+
+def _lire_nombre(texte):
+    return float(texte.replace(',', '.'))
+
+
+def _fin_non_vide(texte, nb_lignes):
+    # Fin du texte à partir de la nb_lignes-ième ligne non vide en partant de la fin
+    fin = len(texte)
+    while nb_lignes and fin > 0:
+        debut = texte.rfind('\n', 0, fin) + 1
+        if texte[debut:fin].strip():
+            nb_lignes -= 1
+        if not nb_lignes:
+            return texte[debut:]
+        fin = debut - 1
+    return texte
+
+
+class ExtracteurNotes:
+    # Extraction des notes alimentée morceau par morceau (une page à la fois par
+    # exemple) : resultat() donne le même dictionnaire que extraire_notes_from_txt
+    # sur la concaténation des morceaux.
+    # Règles de la lecture d'origine conservées :
+    # - une note appartient à la ressource du dernier en-tête vu, y compris une note
+    #   placée avant l'en-tête sur la même ligne ; seul le premier en-tête d'une
+    #   ligne compte
+    # - une note ne compte pour une ressource que si elle tient sur une ligne
+    # - la note de la SAE est la première note qui suit le premier "TBFTE301",
+    #   même séparée par des retours à la ligne
+    def __init__(self):
+        self.notes = {}
+        self.matiere = None
+        self.ecue_vus = set()  # numéros des en-têtes rencontrés (301, 302, ...)
+        self.sae = None
+        self.sae_vue = False
+        self._reste = ''
+        # Texte qui suit "TBFTE301" tant que sa note n'est pas trouvée : une note
+        # à cheval sur deux morceaux n'est vue par aucun des deux
+        self._sae_attente = ''
+
+    def ajouter(self, texte):
+        # Seules les lignes complètes sont traitées, la fin est gardée pour le
+        # morceau suivant
+        self._reste += texte
+        coupe = self._reste.rfind('\n') + 1
+        if coupe:
+            self._traiter(self._reste[:coupe])
+            self._reste = self._reste[coupe:]
+
+    def complet(self, ecue_attendus):
+        # Vrai quand tous les en-têtes attendus et la note de SAE ont été lus
+        return self.sae is not None and ecue_attendus <= self.ecue_vus
+
+    def resultat(self):
+        if self._reste:
+            self._traiter(self._reste)
+            self._reste = ''
+        notes = dict(self.notes)
+        if self.sae is not None:
+            notes['SAE3.01'] = [self.sae]
+        return notes
+
+    def _traiter(self, texte):
+        notes = self.notes
+        matiere = self.matiere
+        fin_entete = -1       # fin de la ligne du dernier en-tête
+        fin_ligne = -1        # fin de la ligne de la dernière note
+        ligne = []            # notes de cette ligne ...
+        matiere_ligne = None  # ... et la ressource à laquelle elles ont été rangées
+        sae_fin = None
+        if self.sae_vue and self.sae is None:
+            if self._sae_attente:
+                r = _NOTE.search(self._sae_attente + texte)
+                if r:
+                    self.sae = (_lire_nombre(r.group(1)), _lire_nombre(r.group(2)))
+            else:
+                sae_fin = 0
+        attente = self._sae_attente + texte
+
+        for m in _JETONS.finditer(texte):
+            genre = m.lastindex
+            if genre == _JETON_NOTE:
+                debut, fin = m.span()
+                if debut > fin_ligne:
+                    ligne = []
+                    matiere_ligne = matiere
+                    fin_ligne = texte.find('\n', debut)
+                    if fin_ligne < 0:
+                        fin_ligne = len(texte)
+                note_coeff = (_lire_nombre(m.group(1)), _lire_nombre(m.group(2)))
+                if fin <= fin_ligne:
+                    if matiere is not None:
+                        notes.setdefault(matiere, []).append(note_coeff)
+                    ligne.append(note_coeff)
+                if sae_fin is not None and self.sae is None and fin > sae_fin:
+                    if debut >= sae_fin:
+                        self.sae = note_coeff
+                    else:
+                        # Note collée au code SAE : on la relit à partir de la fin du code
+                        r = _NOTE.search(texte, sae_fin, fin)
+                        if r:
+                            self.sae = (_lire_nombre(r.group(1)), _lire_nombre(r.group(2)))
+            elif genre == _JETON_ECUE:
+                debut = m.start()
+                if debut < fin_entete:
+                    continue
+                fin_entete = texte.find('\n', debut)
+                if fin_entete < 0:
+                    fin_entete = len(texte)
+                # Convertir 301 en R3.301, 302 en R3.302, etc.
+                ecue = int(m.group(3))
+                self.ecue_vus.add(ecue)
+                matiere = f"R3.{ecue:02d}"
+                if ligne and fin_ligne == fin_entete:
+                    # Les notes déjà lues sur cette ligne passent à la nouvelle ressource
+                    if matiere_ligne is not None:
+                        del notes[matiere_ligne][-len(ligne):]
+                        if not notes[matiere_ligne]:
+                            del notes[matiere_ligne]
+                    notes.setdefault(matiere, []).extend(ligne)
+                    matiere_ligne = matiere
+            elif not self.sae_vue:
+                self.sae_vue = True
+                sae_fin = m.end() + 3
+                attente = texte[sae_fin:]
+
+        self.matiere = matiere
+        if self.sae_vue and self.sae is None:
+            # Une note de SAE s'étale au plus sur trois lignes non vides
+            # ("12,50" / "(coeff" / "1,00)") : inutile de garder plus
+            self._sae_attente = _fin_non_vide(attente, 3)
+        else:
+            self._sae_attente = ''
+
+
+def extraire_notes_from_txt(texte):
+    extracteur = ExtracteurNotes()
+    extracteur.ajouter(texte)
+    return extracteur.resultat()
+
+
+def extraire_nom_prenom(pdf_path):
+    # Extraire le nom du fichier sans le chemin
+    nom_fichier = os.path.basename(pdf_path)
+    # Format attendu: Releve-NOM-PRENOM-TBFS3T-2024-2025.pdf
+    match = re.match(r'Releve-([^-]+)-([^-]+)-TBFS3T-\d{4}-\d{4}', nom_fichier)
+
+    if match:
+        return {'nom': match.group(1), 'prenom': match.group(2)}
+    else:
+        # Si le format ne correspond pas, utiliser le nom du fichier
+        return {'nom': nom_fichier, 'prenom': ''}
+
+
+def convertir_cle(matiere):
+    # Extraire le numéro à 3 chiffres et le convertir en 2 chiffres (R3.301 -> R3.01)
+    num = matiere.split('.')[1]  # '301', '302', etc.
+    return f"R3.{int(num[-2:]):02d}"  # Prend les 2 derniers chiffres
+
+
+def convertir_cles(notes_par_matiere, ignore_sae=True, modele=MODELE_DEFAUT):
+    # Convertir les clés des notes au bon format (R3.301 -> R3.01)
+    # Les clés connues du modèle sont converties par sa table, compilée au
+    # chargement ; convertir_cle ne sert que pour les autres
+    notes_converties = {}
+    matiere_de_cle = modele.matiere_de_cle
+    for matiere, notes in notes_par_matiere.items():
+        if matiere == 'SAE3.01':  # Pas besoin de convertir les SAE
+            if not ignore_sae:  # Ajouter seulement si on n'ignore pas SAE3.01
+                notes_converties[matiere_de_cle.get(matiere, matiere)] = notes
+        else:
+            notes_converties[matiere_de_cle.get(matiere) or convertir_cle(matiere)] = notes
+    return notes_converties
+
+
+def calculer_moyennes_etudiant(notes_par_matiere, ignore_sae=True, coeffs=None,
+                               modele=MODELE_DEFAUT):
+    # Retourne (moyennes_ue, moyenne_generale, moyennes_ressources)
+    # coeffs remplace les coefficients du modèle (modele_coeffs.ModeleCoefficients)
+    # Le détail du calcul est journalisé au niveau DEBUG
+    if coeffs is None:
+        coeffs = modele.coeffs
+    notes_converties = convertir_cles(notes_par_matiere, ignore_sae, modele)
+    debug = journal.isEnabledFor(logging.DEBUG)
+
+    if debug:
+        journal.debug("Notes après conversion des clés:")
+        for matiere, notes in sorted(notes_converties.items()):
+            journal.debug(f"{matiere}: {notes}")
+
+    # Dictionnaire pour stocker les moyennes par UE et par ressource
+    moyennes_ue = {}
+    moyennes_ressources = {}
+
+    for ue, matieres_coeffs in coeffs.items():
+        if debug:
+            journal.debug(f"Calcul pour {ue}:")
+        somme_ponderee = 0
+        somme_coeffs = 0
+
+        for matiere, coeff_ue in matieres_coeffs.items():
+            if debug:
+                journal.debug(f"  Traitement de {matiere} (coeff UE: {coeff_ue})")
+
+            # Ignorer la SAE si demandé
+            if matiere == modele.sae and ignore_sae:
+                if debug:
+                    journal.debug(f"    {matiere} ignorée")
+                continue
+
+            if matiere in notes_converties:
+                notes_matiere = notes_converties[matiere]
+                if debug:
+                    journal.debug(f"    Notes trouvées: {notes_matiere}")
+
+                # Calculer la moyenne pondérée de la matière
+                somme_ponderee_matiere = sum(note * coeff for note, coeff in notes_matiere)
+                somme_coeffs_matiere = sum(coeff for _, coeff in notes_matiere)
+
+                if somme_coeffs_matiere > 0:
+                    moyenne_matiere = somme_ponderee_matiere / somme_coeffs_matiere
+                    moyennes_ressources[matiere] = moyenne_matiere
+                    contribution = moyenne_matiere * coeff_ue
+                    somme_ponderee += contribution
+                    somme_coeffs += coeff_ue
+                    if debug:
+                        journal.debug(f"    Moyenne matière: {moyenne_matiere:.2f}")
+                        journal.debug(f"    Contribution à l'UE: {contribution:.2f}")
+            elif debug:
+                journal.debug("    Pas de notes pour cette matière")
+
+        if debug:
+            journal.debug(f"  Somme pondérée finale: {somme_ponderee:.2f}")
+            journal.debug(f"  Somme coeffs finale: {somme_coeffs:.2f}")
+
+        if somme_coeffs > 0:
+            moyennes_ue[ue] = somme_ponderee / somme_coeffs
+            if debug:
+                journal.debug(f"  Moyenne {ue}: {moyennes_ue[ue]:.2f}/20")
+        else:
+            moyennes_ue[ue] = None
+            if debug:
+                journal.debug(f"  {ue}: Notes manquantes")
+
+    # Calculer la moyenne générale (moyenne des moyennes d'UE)
+    moyennes_valides = [moy for moy in moyennes_ue.values() if moy is not None]
+    if moyennes_valides:
+        moyenne_generale = sum(moyennes_valides) / len(moyennes_valides)
+        if debug:
+            journal.debug(f"  Moyenne générale: {moyenne_generale:.2f}/20")
+    else:
+        moyenne_generale = None
+        if debug:
+            journal.debug("  Moyenne générale: Notes insuffisantes")
+
+    return moyennes_ue, moyenne_generale, moyennes_ressources
+
+
+def calculer_moyenne_ue(moyennes_ressources, index_matiere, matieres_coeffs, ignore_sae=True,
+                        sae='SAE3.01'):
+    # Moyenne d'une UE pour tous les étudiants (NaN si aucune ressource notée)
+    # moyennes_ressources est un tableau étudiants × matières, index_matiere
+    # donne la colonne de chaque matière. Les contributions sont ajoutées dans
+    # l'ordre de matieres_coeffs, comme dans calculer_moyennes_etudiant.
+    nb_etudiants = moyennes_ressources.shape[0]
+    somme_ponderee = np.zeros(nb_etudiants)
+    somme_coeffs = np.zeros(nb_etudiants)
+    for matiere, coeff_ue in matieres_coeffs.items():
+        if (matiere == sae and ignore_sae) or matiere not in index_matiere:
+            continue
+        moyennes = moyennes_ressources[:, index_matiere[matiere]]
+        presentes = ~np.isnan(moyennes)
+        somme_ponderee += np.where(presentes, moyennes * coeff_ue, 0.0)
+        somme_coeffs += np.where(presentes, coeff_ue, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(somme_coeffs > 0, somme_ponderee / somme_coeffs, np.nan)
+
+
+def calculer_moyennes_generales(moyennes_ue):
+    # Moyenne des UE renseignées de chaque étudiant (NaN si aucune)
+    valides = ~np.isnan(moyennes_ue)
+    total = np.zeros(moyennes_ue.shape[0])
+    for u in range(moyennes_ue.shape[1]):
+        total += np.where(valides[:, u], moyennes_ue[:, u], 0.0)
+    nb_valides = valides.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(nb_valides > 0, total / nb_valides, np.nan)
+
+
+def calculer_moyennes_promotion(liste_notes, ignore_sae=True, coeffs=None, matieres=None,
+                                modele=MODELE_DEFAUT):
+    # Même calcul que calculer_moyennes_etudiant, pour toute une promotion en une passe
+    # Retourne (ues, matieres, moyennes_ue, moyennes_generales, moyennes_ressources)
+    # moyennes_ue est un tableau étudiants × UE, moyennes_ressources étudiants × matières,
+    # moyennes_generales un vecteur ; NaN là où calculer_moyennes_etudiant donne None
+    # ou n'a pas de valeur.
+    # Les sommes sont faites dans le même ordre que la version par étudiant, les
+    # résultats sont donc identiques au bit près.
+    # matieres fixe les colonnes de moyennes_ressources ; par défaut, celles
+    # de coeffs dans l'ordre de première apparition, comme les clés de
+    # moyennes_ressources dans la version par étudiant
+    # coeffs remplace les coefficients du modèle (modele_coeffs.ModeleCoefficients)
+    if coeffs is None:
+        coeffs = modele.coeffs
+    ues = list(coeffs)
+    if matieres is None:
+        matieres = list(dict.fromkeys(m for matieres_coeffs in coeffs.values()
+                                      for m in matieres_coeffs))
+        if ignore_sae and modele.sae in matieres:
+            matieres.remove(modele.sae)
+    index_matiere = {m: j for j, m in enumerate(matieres)}
+    nb_etudiants, nb_matieres = len(liste_notes), len(matieres)
+
+    # Aplatir toutes les notes en (cellule étudiant × matière, note, coeff)
+    # clé du relevé -> colonne, -1 si la matière n'a pas de colonne ; les clés
+    # du modèle sont connues d'avance, les autres sont converties à la première
+    # rencontre
+    colonne_de = {cle: index_matiere.get(matiere, -1)
+                  for cle, matiere in modele.matiere_de_cle.items()}
+    cellules, valeurs_notes, valeurs_coeffs = [], [], []
+    for i, notes_par_matiere in enumerate(liste_notes):
+        par_colonne = {}
+        for matiere, notes in notes_par_matiere.items():
+            j = colonne_de.get(matiere)
+            if j is None:
+                if matiere == 'SAE3.01':
+                    j = index_matiere.get(matiere, -1)
+                else:
+                    j = index_matiere.get(convertir_cle(matiere), -1)
+                colonne_de[matiere] = j
+            if j >= 0:
+                par_colonne[j] = notes
+        base = i * nb_matieres
+        for j, notes in par_colonne.items():
+            for note, coeff in notes:
+                cellules.append(base + j)
+                valeurs_notes.append(note)
+                valeurs_coeffs.append(coeff)
+
+    cellules = np.array(cellules, dtype=np.intp)
+    valeurs_coeffs = np.array(valeurs_coeffs, dtype=np.float64)
+    valeurs_notes = np.array(valeurs_notes, dtype=np.float64)
+    taille = nb_etudiants * nb_matieres
+    # bincount accumule dans l'ordre des notes, comme sum() dans la version par étudiant
+    somme_ponderee_matiere = np.bincount(cellules, weights=valeurs_notes * valeurs_coeffs,
+                                         minlength=taille).reshape(nb_etudiants, nb_matieres)
+    somme_coeffs_matiere = np.bincount(cellules, weights=valeurs_coeffs,
+                                       minlength=taille).reshape(nb_etudiants, nb_matieres)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        moyennes_ressources = np.where(somme_coeffs_matiere > 0,
+                                       somme_ponderee_matiere / somme_coeffs_matiere, np.nan)
+    moyennes_ue = np.column_stack(
+        [calculer_moyenne_ue(moyennes_ressources, index_matiere, matieres_coeffs, ignore_sae,
+                             modele.sae)
+         for matieres_coeffs in coeffs.values()]) if ues else np.zeros((nb_etudiants, 0))
+    moyennes_generales = calculer_moyennes_generales(moyennes_ue)
+
+    return ues, matieres, moyennes_ue, moyennes_generales, moyennes_ressources
+
+
+def moyennes_par_etudiant(ues, matieres, moyennes_ue, moyennes_generales, moyennes_ressources):
+    # Reconstruit, pour chaque étudiant, le triplet retourné par calculer_moyennes_etudiant
+    for ligne_ue, generale, ligne_ressources in zip(moyennes_ue.tolist(),
+                                                   moyennes_generales.tolist(),
+                                                   moyennes_ressources.tolist()):
+        yield ({ue: (None if math.isnan(v) else v) for ue, v in zip(ues, ligne_ue)},
+               None if math.isnan(generale) else generale,
+               {m: v for m, v in zip(matieres, ligne_ressources) if not math.isnan(v)})
+
+
+def extraire_notes_pdf(pdf_path, arret_anticipe=True, mesures=SANS_MESURE,
+                       moteur=MOTEUR_PDF_DEFAUT):
+    # Lecture et extraction des notes d'un relevé PDF, page par page
+    # Avec arret_anticipe, les pages qui suivent la dernière ressource attendue
+    # et la SAE (annexes) ne sont pas lues
+    # Un autre moteur que pypdf2 est essayé d'abord ; s'il ne sait pas lire le
+    # document ou que son texte perd des notes (voir _raison_repli), le relevé
+    # est relu avec pypdf2
+    if moteur != 'pypdf2':
+        try:
+            nb_coeffs = []
+            extracteur = _extraire_pages(pdf_path, moteur, arret_anticipe, mesures, nb_coeffs)
+            notes = extracteur.resultat()
+            raison = _raison_repli(extracteur, notes, sum(nb_coeffs))
+            if raison is None:
+                mesures.compter('notes', sum(len(n) for n in notes.values()))
+                return notes
+        except (ErreurMoteurPDF, ErreurLecturePDF) as e:
+            raison = str(e)
+        mesures.compter('repli_pypdf2')
+        journal.info("%s : moteur %s écarté (%s), relecture avec PyPDF2", pdf_path, moteur, raison)
+    extracteur = _extraire_pages(pdf_path, 'pypdf2', arret_anticipe, mesures)
+    return _notes_extraites(extracteur, mesures)
+
+
+def _raison_repli(extracteur, notes, nb_coeffs):
+    # Pourquoi le texte d'un autre moteur que pypdf2 n'est pas retenu (None s'il
+    # l'est) : chaque "(coeff" du texte doit avoir donné une note ; une note que
+    # le moteur coupe en deux lignes disparaîtrait sinon sans erreur
+    if not extracteur.ecue_vus:
+        return "aucune ressource trouvée"
+    nb_notes = sum(len(n) for matiere, n in notes.items() if matiere != 'SAE3.01')
+    if nb_notes < nb_coeffs:
+        return f"{nb_coeffs - nb_notes} note(s) non lue(s) sur {nb_coeffs}"
+    return None
+
+
+def _extraire_pages(pdf_path, moteur, arret_anticipe, mesures, nb_coeffs=None):
+    # nb_coeffs, s'il est fourni, reçoit le nombre de "(coeff" de chaque page lue
+    extracteur = ExtracteurNotes()
+    pages = pages_pdf(pdf_path, moteur)
+    while True:
+        with mesures.etape('lecture_pdf'):
+            texte = next(pages, None)
+        if texte is None:
+            break
+        mesures.compter('pages')
+        with mesures.etape('extraction_notes'):
+            extracteur.ajouter(texte + "\n")
+        if nb_coeffs is not None:
+            nb_coeffs.append(texte.count('(coeff'))
+        if arret_anticipe and extracteur.complet(ECUE_ATTENDUS):
+            pages.close()
+            break
+    return extracteur
+
+
+def _notes_extraites(extracteur, mesures):
+    notes = extracteur.resultat()
+    mesures.compter('notes', sum(len(n) for n in notes.values()))
+    return notes
+
+
+def _extraire_notes_mesurees(pdf_path, moteur=MOTEUR_PDF_DEFAUT):
+    # Version lancée dans le pool quand le lot est mesuré : les mesures du
+    # processus fils reviennent avec les notes
+    mesures = Mesures()
+    return extraire_notes_pdf(pdf_path, mesures=mesures, moteur=moteur), mesures.etat()
+
+
+def extraire_lot(pdf_paths, progression=None, workers=1, cache=None, mesures=None,
+                 annulation=None, moteur=MOTEUR_PDF_DEFAUT, releve_lu=None):
+    # Extrait les notes de chaque relevé, retourne (notes, erreurs)
+    # notes[i] correspond à pdf_paths[i] (None si le fichier est en erreur)
+    # erreurs est une liste de couples (chemin, message)
+    # progression(fait, total) est appelée après chaque fichier si fournie, et
+    # releve_lu(chemin, notes) après chaque fichier lu sans erreur
+    # workers > 1 répartit les fichiers sur un pool de processus ; l'ordre de
+    # pdf_paths est conservé quel que soit l'ordre de fin
+    # cache (CacheExtraction) évite de relire les PDF déjà vus ; il n'est
+    # consulté et rempli que dans ce processus
+    # mesures (instrumentation.Mesures) reçoit les durées et compteurs, y
+    # compris ceux des processus du pool
+    # annulation (threading.Event) arrête le lot après le fichier en cours en
+    # levant TraitementAnnule ; les fichiers pas encore commencés sont abandonnés
+    # moteur choisit le moteur de lecture des PDF (voir extraire_notes_pdf) ;
+    # le cache garde à part les notes lues avec chaque moteur
+    total = len(pdf_paths)
+    mesurer = mesures is not None
+    mesures = mesures or SANS_MESURE
+    notes = [None] * total
+    erreurs_par_index = {}
+    fait = 0
+
+    def avancer(i):
+        nonlocal fait
+        fait += 1
+        if releve_lu and notes[i] is not None:
+            releve_lu(pdf_paths[i], notes[i])
+        if progression:
+            progression(fait, total)
+        if annulation is not None and annulation.is_set():
+            raise TraitementAnnule()
+
+    a_extraire = []
+    empreintes = {}
+    for i, pdf_path in enumerate(pdf_paths):
+        if cache is None:
+            a_extraire.append(i)
+            continue
+        with mesures.etape('cache'):
+            try:
+                empreintes[i] = empreinte_fichier(pdf_path)
+                if moteur != 'pypdf2':
+                    empreintes[i] += ':' + moteur
+            except OSError as e:
+                erreurs_par_index[i] = f"Erreur lors de la lecture du PDF : {str(e)}"
+                avancer(i)
+                continue
+            notes[i] = cache.get(empreintes[i])
+        if notes[i] is None:
+            mesures.compter('cache_manques')
+            a_extraire.append(i)
+        else:
+            mesures.compter('cache_succes')
+            avancer(i)
+
+    def enregistrer(i, notes_i):
+        notes[i] = notes_i
+        if cache is not None:
+            cache.put(empreintes[i], notes_i)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(a_extraire))
+
+    if workers <= 1:
+        for i in a_extraire:
+            try:
+                enregistrer(i, extraire_notes_pdf(pdf_paths[i], mesures=mesures, moteur=moteur))
+            except ErreurLecturePDF as e:
+                erreurs_par_index[i] = str(e)
+            with mesures.etape('progression'):
+                avancer(i)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            fonction = functools.partial(
+                _extraire_notes_mesurees if mesurer else extraire_notes_pdf, moteur=moteur)
+            futures = {executor.submit(fonction, pdf_paths[i]): i for i in a_extraire}
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    if mesurer:
+                        notes_i, mesures_fils = future.result()
+                        mesures.fusionner(mesures_fils)
+                    else:
+                        notes_i = future.result()
+                    enregistrer(i, notes_i)
+                except Exception as e:
+                    # Un fichier en échec (ou un processus tombé) n'arrête pas le lot
+                    erreurs_par_index[i] = str(e)
+                try:
+                    with mesures.etape('progression'):
+                        avancer(i)
+                except TraitementAnnule:
+                    # Sans attendre les fichiers restants du pool
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    raise
+
+    erreurs = [(pdf_paths[i], erreurs_par_index[i]) for i in sorted(erreurs_par_index)]
+    mesures.compter('erreurs', len(erreurs))
+    return notes, erreurs
+
+
+def resultats_promotion(lus, ignore_sae=True, modele=MODELE_DEFAUT):
+    # lus: couples ({'nom', 'prenom'}, notes) des relevés d'un même semestre
+    ues, matieres, *moyennes = calculer_moyennes_promotion(
+        [notes_i for _, notes_i in lus], ignore_sae, modele=modele)
+    resultats = ResultatsPromotion(len(lus), ues, matieres)
+    resultats.ajouter_bloc([nom_prenom for nom_prenom, _ in lus], ues, matieres, *moyennes)
+    return resultats
+
+
+def promotions_par_semestre(releves, ignore_sae=True, modeles=None, programme=PROGRAMME_DEFAUT,
+                            semestre=None):
+    # releves: triplets (source, {'nom', 'prenom'}, notes) ; chaque relevé est
+    # classé avec les relevés de son semestre (d'après ses codes ECUE,
+    # SEMESTRE_DEFAUT s'il n'en a pas), semestre force le même pour tous
+    # Retourne ({semestre: ResultatsPromotion}, erreurs)
+    modeles = modeles if modeles is not None else charger_modeles()
+    groupes = {}
+    erreurs = []
+    for source, nom_prenom, notes_i in releves:
+        semestre_i = semestre or semestre_des_notes(notes_i) or SEMESTRE_DEFAUT
+        if (programme, semestre_i) in modeles:
+            groupes.setdefault(semestre_i, []).append((nom_prenom, notes_i))
+        else:
+            erreurs.append((source, f"Pas de coefficients pour {programme} {semestre_i}"))
+    resultats = {semestre_i: resultats_promotion(lus, ignore_sae, modeles[(programme, semestre_i)])
+                 for semestre_i, lus in sorted(groupes.items())}
+    return resultats, erreurs
+
+
+def traiter_lot_par_semestre(pdf_paths, ignore_sae=True, progression=None, workers=1,
+                             cache=None, mesures=None, chemin_modele=None,
+                             programme=PROGRAMME_DEFAUT, semestre=None,
+                             moteur=MOTEUR_PDF_DEFAUT, releves=()):
+    # Traite une liste de relevés qui peut mélanger plusieurs semestres (voir
+    # promotions_par_semestre) ; releves ajoute au lot des relevés déjà lus,
+    # triplets (source, {'nom', 'prenom'}, notes) d'une archive de textes par exemple
+    # Voir extraire_lot pour progression, workers, cache, mesures et moteur
+    # Retourne ({semestre: ResultatsPromotion}, erreurs)
+    modeles = charger_modeles(chemin_modele)
+    notes, erreurs = extraire_lot(pdf_paths, progression, workers, cache, mesures,
+                                  moteur=moteur)
+    with (mesures or SANS_MESURE).etape('calcul_moyennes'):
+        lus = [(pdf_path, extraire_nom_prenom(pdf_path), notes_i)
+               for pdf_path, notes_i in zip(pdf_paths, notes) if notes_i is not None]
+        resultats, erreurs_semestre = promotions_par_semestre(
+            lus + list(releves), ignore_sae, modeles, programme, semestre)
+    return resultats, erreurs + erreurs_semestre
+
+
+def lister_releves(sources):
+    # Accepte des fichiers, des dossiers (Releve-*.pdf) ou des motifs glob
+    pdf_paths = []
+    for source in sources:
+        if os.path.isdir(source):
+            pdf_paths.extend(sorted(glob.glob(os.path.join(source, 'Releve-*.pdf'))))
+        elif glob.has_magic(source):
+            pdf_paths.extend(sorted(glob.glob(source)))
+        else:
+            pdf_paths.append(source)
+    return pdf_paths
+
+
+def classer_resultats(resultats):
+    # resultats: ResultatsPromotion
+    df = resultats.dataframe()
+
+    # Trier par moyenne générale décroissante (ex aequo dans l'ordre des relevés)
+    df = df.sort_values(by='Moyenne générale', ascending=False, kind='stable')
+
+    # Ajouter le rang
+    df['Rang'] = range(1, len(df) + 1)
+
+    # Réorganiser les colonnes (nom, prénom, rang, moyenne générale, puis le reste)
+    colonnes = COLONNES_TETE + [col for col in df.columns if col not in COLONNES_TETE]
+    return df[colonnes]
+
+
+def lignes_resume(nb_etudiants, premiers, derniers, moyenne_promotion):
+    # premiers et derniers: suites de (rang, prénom, nom, moyenne générale)
+    lignes = [f"Résumé du traitement batch ({nb_etudiants} étudiants) :", "-" * 40]
+
+    # Afficher les 3 premiers et les 3 derniers
+    lignes.append("Top 3 :")
+    for rang, prenom, nom, moyenne in premiers:
+        lignes.append(f"{rang}. {prenom} {nom}: {moyenne:.2f}/20")
+
+    lignes.append("")
+    lignes.append("Derniers :")
+    for rang, prenom, nom, moyenne in derniers:
+        lignes.append(f"{rang}. {prenom} {nom}: {moyenne:.2f}/20")
+
+    lignes.append("")
+    lignes.append(f"Moyenne de la promotion: {moyenne_promotion:.2f}/20")
+    return "\n".join(lignes) + "\n"
+
+
+def rangs_extremes(moyennes_generales, k=3):
+    # (rang, indice) des k premiers et des k derniers, dans l'ordre du tri de
+    # classer_resultats (moyenne décroissante, sans moyenne à la fin, ex aequo
+    # dans l'ordre des indices), sans trier toute la promotion : O(n log k)
+    cles = [(0, -g, i) if g == g else (1, 0.0, i)
+            for i, g in enumerate(np.asarray(moyennes_generales, dtype=float).tolist())]
+    nb = len(cles)
+    premiers = [(rang + 1, cle[2]) for rang, cle in enumerate(heapq.nsmallest(k, cles))]
+    derniers = heapq.nlargest(k, cles)[::-1]
+    return premiers, [(nb - len(derniers) + rang + 1, cle[2])
+                      for rang, cle in enumerate(derniers)]
+
+
+def resume_classement(df):
+    # Texte du résumé affiché après un traitement batch ; df n'a pas besoin
+    # d'être trié
+    moyennes = df['Moyenne générale'].to_numpy(dtype=float)
+    prenoms, noms = df['Prénom'].to_numpy(), df['Nom'].to_numpy()
+    premiers, derniers = rangs_extremes(moyennes)
+
+    def lignes(rangs):
+        return [(rang, prenoms[i], noms[i], moyennes[i]) for rang, i in rangs]
+
+    return lignes_resume(len(df), lignes(premiers), lignes(derniers),
+                         df['Moyenne générale'].mean())
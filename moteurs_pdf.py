@@ -0,0 +1,284 @@
+# Moteurs d'extraction du texte des pages d'un PDF
+# - pypdf2 : PdfReader.extract_text, la référence
+# - flux : lecture directe des flux de contenu des pages (opérateurs de texte
+#   Tj, TJ, ', ", T*, Td...), sans interpréter les polices ; refuse les PDF
+#   qu'il ne sait pas lire (polices à encodage propre, flux d'objets, chiffrement)
+# - pypdfium2 et pdfminer, s'ils sont installés
+# Chaque moteur est un générateur du texte de chaque page ; il lève
+# ErreurMoteurPDF quand le document sort de ce qu'il sait lire.
+# moteur_calcul.extraire_notes_pdf revient à pypdf2 quand un autre moteur
+# échoue, que son texte ne donne aucune ressource ou qu'il perd des notes :
+# chaque "(coeff" du texte doit donner une note (voir moteur_calcul._raison_repli).
+import re
+import zlib
+import importlib.util
+
+
+class ErreurMoteurPDF(Exception):
+    pass
+
+
+def pages_pypdf2(pdf_path):
+    from PyPDF2 import PdfReader
+    with open(pdf_path, 'rb') as file:
+        for page in PdfReader(file).pages:
+            yield page.extract_text()
+
+
+def pages_pypdfium2(pdf_path):
+    import pypdfium2
+    document = pypdfium2.PdfDocument(pdf_path)
+    try:
+        for page in document:
+            texte = page.get_textpage()
+            # pdfium sépare les lignes par \r\n
+            yield texte.get_text_range().replace('\r\n', '\n')
+            texte.close()
+            page.close()
+    finally:
+        document.close()
+
+
+def pages_pdfminer(pdf_path):
+    from pdfminer.high_level import extract_pages
+    from pdfminer.layout import LAParams, LTTextContainer
+    # Marges serrées : une ligne du relevé reste une ligne de texte
+    parametres = LAParams(line_margin=0.1, char_margin=4.0, boxes_flow=None)
+    for page in extract_pages(pdf_path, laparams=parametres):
+        yield "".join(element.get_text() for element in page
+                      if isinstance(element, LTTextContainer)).rstrip('\n')
+
+
+# --- Moteur flux ---
+
+_OBJET = re.compile(rb'(\d+)\s+\d+\s+obj\b(.*?)\bendobj', re.S)
+_REFERENCE = re.compile(rb'(\d+)\s+\d+\s+R')
+_RACINE = re.compile(rb'/Root\s+(\d+)\s+\d+\s+R')
+_TYPE = re.compile(rb'/Type\s*/(\w+)')
+_KIDS = re.compile(rb'/Kids\s*\[([^\]]*)\]')
+_CONTENTS = re.compile(rb'/Contents\s*(?:\[([^\]]*)\]|(\d+)\s+\d+\s+R)')
+_DEBUT_FLUX = re.compile(rb'stream\r?\n')
+# Polices dont le texte ne peut pas être lu octet par octet
+_POLICES_SPECIALES = re.compile(rb'/Type0\b|/Type3\b|/Differences\b|/ToUnicode\b|/Identity-H\b')
+# Jetons d'un flux de contenu, hors chaînes littérales (lues à part à cause
+# des parenthèses imbriquées)
+_JETON = re.compile(rb'\s+|%[^\r\n]*|(<<|>>|\[|\])|<([0-9A-Fa-f\s]*)>'
+                    rb'|(/[^\s/\[\]()<>{}%]*)|([-+]?(?:\d+\.?\d*|\.\d+))|([^\s/\[\]()<>{}%]+)')
+_SPECIAL_CHAINE = re.compile(rb'[\\()]')
+_ECHAPPEMENTS = {ord('n'): b'\n', ord('r'): b'\r', ord('t'): b'\t', ord('b'): b'\b',
+                 ord('f'): b'\f', ord('('): b'(', ord(')'): b')', ord('\\'): b'\\'}
+
+
+def _chaine_litterale(flux, debut):
+    # Lit la chaîne qui commence à flux[debut] == '(' ; retourne (octets, fin)
+    # Les octets ordinaires sont copiés par tranches jusqu'au prochain \, ( ou )
+    resultat = bytearray()
+    profondeur = 1
+    i = debut + 1
+    while True:
+        m = _SPECIAL_CHAINE.search(flux, i)
+        if m is None:
+            raise ErreurMoteurPDF("Chaîne non terminée dans un flux de contenu")
+        j = m.start()
+        resultat += flux[i:j]
+        c = flux[j]
+        i = j + 1
+        if c == 0x5C:  # backslash
+            suivant = flux[i:i + 1]
+            if not suivant:
+                raise ErreurMoteurPDF("Chaîne non terminée dans un flux de contenu")
+            code = suivant[0]
+            i += 1
+            if code in _ECHAPPEMENTS:
+                resultat += _ECHAPPEMENTS[code]
+            elif 0x30 <= code <= 0x37:
+                fin = i
+                while fin < min(i + 2, len(flux)) and 0x30 <= flux[fin] <= 0x37:
+                    fin += 1
+                resultat.append(int(flux[i - 1:fin], 8) & 0xFF)
+                i = fin
+            elif code == 0x0D:
+                if flux[i:i + 1] == b'\n':
+                    i += 1
+            elif code != 0x0A:
+                resultat.append(code)
+        elif c == 0x28:
+            profondeur += 1
+            resultat.append(c)
+        else:
+            profondeur -= 1
+            if profondeur == 0:
+                return bytes(resultat), i
+            resultat.append(c)
+
+
+def _texte_flux(flux):
+    # Texte d'un flux de contenu : une ligne par changement de ligne de texte
+    # Un déplacement sur la même ligne de base (cellules d'un tableau placées par
+    # Tm ou Td) sépare les morceaux par une espace au lieu d'un retour à la ligne
+    lignes, ligne = [], []
+    operandes = []
+    pile_tableaux = []
+    y = 0.0          # ordonnée de la ligne en cours
+    interligne = 0.0  # TL, utilisé par T*, ' et "
+
+    def nouvelle_ligne():
+        # Pas de ligne vide avant le premier texte
+        if ligne or lignes:
+            lignes.append("".join(ligne))
+            ligne.clear()
+
+    def deplacer(nouvel_y):
+        nonlocal y
+        if nouvel_y == y:
+            if ligne:
+                ligne.append(' ')
+        else:
+            nouvelle_ligne()
+        y = nouvel_y
+
+    def ligne_suivante():
+        # T*, ' et " passent toujours à la ligne, même avec un interligne nul
+        nonlocal y
+        nouvelle_ligne()
+        y -= interligne
+
+    def montrer(chaine):
+        ligne.append(chaine.decode('cp1252', errors='replace'))
+
+    i, n = 0, len(flux)
+    while i < n:
+        if flux[i] == 0x28:
+            chaine, i = _chaine_litterale(flux, i)
+            (pile_tableaux[-1] if pile_tableaux else operandes).append(chaine)
+            continue
+        m = _JETON.match(flux, i)
+        if m is None:
+            raise ErreurMoteurPDF(f"Jeton illisible dans un flux de contenu à {i}")
+        i = m.end()
+        delimiteur, hexa, nom, nombre, operateur = m.groups()
+        if delimiteur == b'[':
+            pile_tableaux.append([])
+        elif delimiteur == b']':
+            tableau = pile_tableaux.pop()
+            (pile_tableaux[-1] if pile_tableaux else operandes).append(tableau)
+        elif delimiteur is not None:
+            # Dictionnaires (marquage de contenu) : sans effet sur le texte
+            operandes.append(delimiteur)
+        elif hexa is not None:
+            raise ErreurMoteurPDF("Chaîne hexadécimale : encodage de police non pris en charge")
+        elif nom is not None or nombre is not None:
+            valeur = nom if nom is not None else float(nombre)
+            (pile_tableaux[-1] if pile_tableaux else operandes).append(valeur)
+        elif operateur is not None:
+            if operateur == b'Tj' and operandes:
+                montrer(operandes[-1])
+            elif operateur == b'TJ' and operandes:
+                for element in operandes[-1]:
+                    if isinstance(element, bytes):
+                        montrer(element)
+                    elif element < -250:
+                        # Grand décalage vers la droite : espace entre deux mots
+                        ligne.append(' ')
+            elif operateur in (b"'", b'"') and operandes:
+                ligne_suivante()
+                montrer(operandes[-1])
+            elif operateur == b'T*':
+                ligne_suivante()
+            elif operateur == b'BT':
+                y = 0.0
+            elif operateur == b'TL' and operandes:
+                interligne = operandes[-1]
+            elif operateur in (b'Td', b'TD') and len(operandes) >= 2:
+                if operateur == b'TD':
+                    interligne = -operandes[-1]
+                deplacer(y + operandes[-1])
+            elif operateur == b'Tm' and len(operandes) >= 6:
+                deplacer(operandes[-1])
+            elif operateur in (b'BI', b'ID'):
+                raise ErreurMoteurPDF("Image en ligne dans un flux de contenu")
+            operandes = []
+    # Ligne en cours, vide si le flux finit par un changement de ligne (le
+    # texte se termine alors par un retour à la ligne, comme avec PyPDF2)
+    nouvelle_ligne()
+    return lignes
+
+
+def _donnees_flux(corps):
+    m = _DEBUT_FLUX.search(corps)
+    if m is None:
+        raise ErreurMoteurPDF("Objet de contenu sans flux")
+    dictionnaire = corps[:m.start()]
+    donnees = corps[m.end():corps.rfind(b'endstream')].rstrip(b'\r\n')
+    if b'/DecodeParms' in dictionnaire:
+        raise ErreurMoteurPDF("Paramètres de décodage non pris en charge")
+    filtres = re.findall(rb'/(\w+Decode)\b', dictionnaire)
+    if filtres == [b'FlateDecode']:
+        return zlib.decompress(donnees)
+    if filtres:
+        raise ErreurMoteurPDF(f"Filtre non pris en charge : {b' '.join(filtres).decode()}")
+    return donnees
+
+
+def pages_flux(pdf_path):
+    with open(pdf_path, 'rb') as f:
+        donnees = f.read()
+    if b'/Encrypt' in donnees:
+        raise ErreurMoteurPDF("PDF chiffré")
+    if b'/ObjStm' in donnees:
+        raise ErreurMoteurPDF("Objets compressés (flux d'objets) non pris en charge")
+    if _POLICES_SPECIALES.search(donnees):
+        raise ErreurMoteurPDF("Police à encodage spécifique non prise en charge")
+    # Une mise à jour incrémentale redéfinit les objets plus loin dans le fichier
+    objets = {int(m.group(1)): m.group(2) for m in _OBJET.finditer(donnees)}
+
+    racines = _RACINE.findall(donnees)
+    if not racines:
+        raise ErreurMoteurPDF("Catalogue introuvable")
+    catalogue = objets.get(int(racines[-1]), b'')
+    m = re.search(rb'/Pages\s+(\d+)\s+\d+\s+R', catalogue)
+    if m is None:
+        raise ErreurMoteurPDF("Arbre des pages introuvable")
+
+    # Parcours de l'arbre des pages dans l'ordre du document
+    a_visiter = [int(m.group(1))]
+    vus = set()
+    while a_visiter:
+        numero = a_visiter.pop()
+        if numero in vus or numero not in objets:
+            raise ErreurMoteurPDF("Arbre des pages incohérent")
+        vus.add(numero)
+        corps = objets[numero]
+        genre = _TYPE.search(corps)
+        if genre is not None and genre.group(1) == b'Pages':
+            kids = _KIDS.search(corps)
+            if kids is None:
+                raise ErreurMoteurPDF("Noeud de pages sans /Kids")
+            a_visiter.extend(reversed([int(r) for r in _REFERENCE.findall(kids.group(1))]))
+            continue
+        contenus = _CONTENTS.search(corps)
+        if contenus is None:
+            yield ""
+            continue
+        if contenus.group(1) is not None:
+            references = [int(r) for r in _REFERENCE.findall(contenus.group(1))]
+        else:
+            references = [int(contenus.group(2))]
+        flux = b"\n".join(_donnees_flux(objets[r]) for r in references if r in objets)
+        yield "\n".join(_texte_flux(flux))
+
+
+MOTEURS = {
+    'pypdf2': pages_pypdf2,
+    'flux': pages_flux,
+    'pypdfium2': pages_pypdfium2,
+    'pdfminer': pages_pdfminer,
+}
+
+# Module à installer pour chaque moteur (flux n'en demande aucun)
+_MODULES = {'pypdf2': 'PyPDF2', 'pypdfium2': 'pypdfium2', 'pdfminer': 'pdfminer'}
+
+
+def moteurs_disponibles():
+    return [nom for nom in MOTEURS
+            if nom not in _MODULES or importlib.util.find_spec(_MODULES[nom]) is not None]
@@ -0,0 +1,82 @@
+# Stockage en colonnes des résultats d'un traitement batch
+# Une ligne par étudiant dans un tableau numpy préalloué (une colonne par
+# moyenne : générale, UE, ressources de MATIERES) et des noms internés. Pas de
+# dictionnaire par étudiant ; la capacité double quand elle est atteinte.
+import numpy as np
+from matieres_coeffs import MATIERES, COEFFICIENTS
+
+
+class ResultatsPromotion:
+    def __init__(self, capacite=64, ues=None, matieres=None, dtype=np.float64):
+        self.ues = list(COEFFICIENTS) if ues is None else list(ues)
+        self.matieres = list(MATIERES) if matieres is None else list(matieres)
+        self.colonnes = ['Moyenne générale'] + self.ues + self.matieres
+        self.index_colonne = {c: j for j, c in enumerate(self.colonnes)}
+        self.nb = 0
+        # Ordre Fortran : chaque colonne est contiguë, la vue DataFrame ne copie rien
+        self._valeurs = np.full((max(capacite, 1), len(self.colonnes)), np.nan,
+                                dtype=dtype, order='F')
+        self._codes_noms = np.empty((max(capacite, 1), 2), dtype=np.int32)
+        # Table des noms et prénoms, chaque chaîne n'y figure qu'une fois
+        self.table_noms = []
+        self._code_de = {}
+
+    def __len__(self):
+        return self.nb
+
+    def _code(self, texte):
+        code = self._code_de.get(texte)
+        if code is None:
+            code = self._code_de[texte] = len(self.table_noms)
+            self.table_noms.append(texte)
+        return code
+
+    def _reserver(self, nb_lignes):
+        capacite = self._valeurs.shape[0]
+        if self.nb + nb_lignes <= capacite:
+            return
+        capacite = max(capacite, 1)
+        while capacite < self.nb + nb_lignes:
+            capacite *= 2
+        valeurs = np.full((capacite, len(self.colonnes)), np.nan,
+                          dtype=self._valeurs.dtype, order='F')
+        valeurs[:self.nb] = self._valeurs[:self.nb]
+        codes = np.empty((capacite, 2), dtype=np.int32)
+        codes[:self.nb] = self._codes_noms[:self.nb]
+        self._valeurs, self._codes_noms = valeurs, codes
+
+    def ajouter_bloc(self, noms, ues, matieres, moyennes_ue, moyennes_generales,
+                     moyennes_ressources):
+        # Ajoute d'un coup les tableaux de calculer_moyennes_promotion
+        nb_lignes = len(noms)
+        self._reserver(nb_lignes)
+        lignes = slice(self.nb, self.nb + nb_lignes)
+        # reshape : un bloc vide donne aussi un tableau à deux colonnes
+        self._codes_noms[lignes] = np.array(
+            [(self._code(n['nom']), self._code(n['prenom'])) for n in noms],
+            dtype=np.int32).reshape(-1, 2)
+        self._valeurs[lignes, 0] = moyennes_generales
+        self._valeurs[lignes, [self.index_colonne[ue] for ue in ues]] = moyennes_ue
+        self._valeurs[lignes, [self.index_colonne[m] for m in matieres]] = moyennes_ressources
+        self.nb += nb_lignes
+
+    def vue(self):
+        # DataFrame sur les tableaux du stockage, sans copie des moyennes
+        # Nom et Prénom sont des catégories construites sur la table des noms
+        import pandas as pd
+        df = pd.DataFrame(self._valeurs[:self.nb], columns=self.colonnes, copy=False)
+        categories = pd.Index(self.table_noms, dtype=object)
+        df.insert(0, 'Prénom', pd.Categorical.from_codes(self._codes_noms[:self.nb, 1],
+                                                         categories=categories))
+        df.insert(0, 'Nom', pd.Categorical.from_codes(self._codes_noms[:self.nb, 0],
+                                                      categories=categories))
+        return df
+
+    def dataframe(self):
+        # Comme le DataFrame des dictionnaires d'étudiants : les ressources sans
+        # aucune moyenne n'ont pas de colonne
+        valeurs = self._valeurs[:self.nb, len(self.ues) + 1:]
+        vides = {m for m, notee in zip(self.matieres, (~np.isnan(valeurs)).any(axis=0))
+                 if not notee}
+        df = self.vue()
+        return df[[c for c in df.columns if c not in vides]] if vides else df
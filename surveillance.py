@@ -0,0 +1,199 @@
+# Mode surveillance : suit un dossier où les relevés arrivent au fil des jours
+# Seuls les Releve-*.pdf nouveaux ou modifiés (date ou taille) sont lus ; le
+# classement est mis à jour étudiant par étudiant (classement.ClassementPromotion)
+# et le fichier de résultats est remplacé d'un coup (écriture dans un fichier
+# temporaire puis os.replace), il n'est donc jamais lu à moitié écrit.
+# Le dossier est parcouru toutes les --intervalle secondes ; si le module
+# inotify_simple est installé (Linux), le parcours a lieu dès qu'un fichier change.
+# Exemple: python surveillance.py releves/ -o classement.xlsx
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+from contextlib import nullcontext
+from matieres_coeffs import COEFFICIENTS
+from moteur_calcul import extraire_lot, extraire_nom_prenom
+from classement import ClassementPromotion
+from cache_extraction import CacheExtraction, CHEMIN_DEFAUT
+from export_resultats import ecrire_resultats, format_du_fichier, verifier_format, ErreurExport
+from instrumentation import journal
+
+try:
+    import inotify_simple
+except ImportError:
+    inotify_simple = None
+
+
+def etat_dossier(dossier):
+    # chemin -> (date de modification en ns, taille) des Releve-*.pdf du dossier
+    etat = {}
+    with os.scandir(dossier) as entrees:
+        for entree in entrees:
+            if (entree.name.startswith('Releve-') and entree.name.endswith('.pdf')
+                    and entree.is_file()):
+                stat = entree.stat()
+                etat[entree.path] = (stat.st_mtime_ns, stat.st_size)
+    return etat
+
+
+def _droits_sortie(chemin):
+    # Droits du fichier remplacé s'il existe, sinon ceux d'un fichier créé
+    # normalement (mkstemp crée en 0600, illisible pour les autres utilisateurs)
+    try:
+        return os.stat(chemin).st_mode & 0o777
+    except FileNotFoundError:
+        masque = os.umask(0)
+        os.umask(masque)
+        return 0o666 & ~masque
+
+
+def ecrire_atomique(df, chemin):
+    # Le fichier temporaire est dans le même dossier pour que os.replace ne
+    # traverse pas de système de fichiers
+    dossier = os.path.dirname(os.path.abspath(chemin))
+    descripteur, temporaire = tempfile.mkstemp(dir=dossier, prefix='.classement-', suffix='.tmp')
+    os.close(descripteur)
+    try:
+        ecrire_resultats(df, temporaire, format_du_fichier(chemin))
+        os.chmod(temporaire, _droits_sortie(chemin))
+        os.replace(temporaire, chemin)
+    except BaseException:
+        os.unlink(temporaire)
+        raise
+
+
+class SurveillanceDossier:
+    def __init__(self, dossier, sortie, ignore_sae=True, workers=1, cache=None):
+        self.dossier = dossier
+        self.sortie = sortie
+        self.workers = workers
+        self.cache = cache
+        self.classement = ClassementPromotion([], [], COEFFICIENTS, ignore_sae)
+        self.vus = {}       # chemin -> (date, taille) lors de la dernière lecture
+        self.indices = {}   # chemin -> indice dans le classement
+        self.erreurs = {}   # chemin -> message, relu seulement s'il change encore
+
+    def passe(self):
+        # Un parcours du dossier ; retourne le nombre de relevés ajoutés,
+        # modifiés ou retirés
+        etat = etat_dossier(self.dossier)
+        a_lire = sorted(chemin for chemin, signature in etat.items()
+                        if self.vus.get(chemin) != signature)
+        retires = [chemin for chemin in self.vus if chemin not in etat]
+
+        for chemin in retires:
+            del self.vus[chemin]
+            self.erreurs.pop(chemin, None)
+            i = self.indices.pop(chemin, None)
+            if i is not None:
+                self.classement.retirer(i)
+                for autre, j in self.indices.items():
+                    if j > i:
+                        self.indices[autre] = j - 1
+            journal.info("Retiré : %s", chemin)
+
+        if a_lire:
+            notes, erreurs = extraire_lot(a_lire, workers=self.workers, cache=self.cache)
+            erreurs = dict(erreurs)
+            for chemin, notes_i in zip(a_lire, notes):
+                self.vus[chemin] = etat[chemin]
+                if notes_i is None:
+                    # Fichier en cours de copie ou illisible : il sera relu à
+                    # sa prochaine modification
+                    self.erreurs[chemin] = erreurs[chemin]
+                    journal.warning("%s: %s", chemin, erreurs[chemin])
+                    continue
+                self.erreurs.pop(chemin, None)
+                nom = extraire_nom_prenom(chemin)
+                if chemin in self.indices:
+                    self.classement.remplacer(self.indices[chemin], nom, notes_i)
+                    journal.info("Mis à jour : %s", chemin)
+                else:
+                    self.indices[chemin] = self.classement.ajouter(nom, notes_i)
+                    journal.info("Ajouté : %s", chemin)
+
+        if a_lire and self.cache is not None:
+            # Le cache reste ouvert tant que la surveillance tourne
+            self.cache.valider()
+
+        nb_changements = len(a_lire) + len(retires)
+        if nb_changements:
+            ecrire_atomique(self.classement.dataframe(), self.sortie)
+        return nb_changements
+
+    def boucle(self, intervalle=2.0):
+        # Jusqu'à Ctrl+C
+        observateur = None
+        if inotify_simple is not None:
+            drapeaux = inotify_simple.flags
+            observateur = inotify_simple.INotify()
+            observateur.add_watch(self.dossier, drapeaux.CLOSE_WRITE | drapeaux.MOVED_TO
+                                  | drapeaux.MOVED_FROM | drapeaux.DELETE)
+        try:
+            while True:
+                if self.passe():
+                    print(self.classement.resume(), end='', flush=True)
+                if observateur is not None:
+                    # Attend un événement, avec un parcours au moins toutes les
+                    # intervalle secondes au cas où un événement serait perdu
+                    observateur.read(timeout=int(intervalle * 1000))
+                else:
+                    time.sleep(intervalle)
+        finally:
+            if observateur is not None:
+                observateur.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Surveille un dossier de relevés PDF et tient le classement à jour "
+                    "à chaque relevé ajouté, modifié ou supprimé.")
+    parser.add_argument('dossier', help="Dossier où arrivent les Releve-*.pdf")
+    parser.add_argument('-o', '--sortie', default='classement_promotion.csv',
+                        help="Fichier de résultats, format selon l'extension "
+                             "(.csv, .xlsx, .parquet, .feather ; par défaut %(default)s)")
+    parser.add_argument('--intervalle', type=float, default=2.0,
+                        help="Secondes entre deux parcours du dossier (par défaut %(default)s)")
+    parser.add_argument('--une-fois', action='store_true',
+                        help="Faire un seul parcours puis quitter")
+    parser.add_argument('--inclure-sae', action='store_true',
+                        help="Prendre en compte SAE3.01 (ignorée par défaut, comme dans l'interface)")
+    parser.add_argument('-j', '--workers', type=int, default=1,
+                        help="Processus de lecture quand plusieurs relevés arrivent ensemble")
+    parser.add_argument('--cache', default=CHEMIN_DEFAUT,
+                        help="Cache des notes déjà extraites (par défaut %(default)s)")
+    parser.add_argument('--sans-cache', action='store_true',
+                        help="Relire tous les PDF sans consulter ni remplir le cache")
+    parser.add_argument('-v', '--verbose', action='count', default=0,
+                        help="-v: relevés lus, -vv: messages de débogage")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=[logging.WARNING, logging.INFO, logging.DEBUG][min(args.verbose, 2)],
+                        format='%(message)s')
+    if not os.path.isdir(args.dossier):
+        print(f"{args.dossier} n'est pas un dossier.", file=sys.stderr)
+        return 1
+    try:
+        verifier_format(format_du_fichier(args.sortie))
+    except ErreurExport as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    with (nullcontext() if args.sans_cache else CacheExtraction(args.cache)) as cache:
+        surveillance = SurveillanceDossier(args.dossier, args.sortie, not args.inclure_sae,
+                                           args.workers, cache)
+        if args.une_fois:
+            surveillance.passe()
+            print(surveillance.classement.resume(), end='')
+            return 0
+        try:
+            surveillance.boucle(args.intervalle)
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+# Le classement tenu à jour par ajouts, remplacements, retraits et changements
+# de coefficients doit rester identique, au bit près, à un classement
+# recalculé depuis les notes
+# Exemple: python -m pytest tests
+import os
+import sys
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+sys.path.insert(0, os.path.join(RACINE, 'benchmarks'))
+from classement import ClassementPromotion
+from generateur_releves import generer_promotion, pdf_releve, texte_releve
+from matieres_coeffs import MODELE_DEFAUT
+from moteur_calcul import (calculer_moyennes_promotion, classer_resultats, extraire_nom_prenom,
+                           extraire_notes_pdf, resultats_promotion)
+from surveillance import SurveillanceDossier
+
+CLES = sorted(MODELE_DEFAUT.matiere_de_cle)
+MATIERES = MODELE_DEFAUT.matieres
+
+
+def releve_aleatoire(rng):
+    # Relevé vide de temps en temps, pour avoir des étudiants sans moyenne
+    if rng.random() < 0.1:
+        return {}
+    return {cle: [(rng.randrange(2001) / 100, rng.choice([0.0, 1.0, 2.0]))
+                  for _ in range(rng.randrange(1, 3))]
+            for cle in CLES if rng.random() < 0.7}
+
+
+def nom_aleatoire(rng):
+    # Peu de noms différents : des homonymes, et des ex aequo avec les relevés vides
+    return {'nom': f'NOM{rng.randrange(10)}', 'prenom': f'PRENOM{rng.randrange(3)}'}
+
+
+def memes_tableaux(obtenu, attendu):
+    for attribut in ('moyennes_ressources', 'moyennes_ue', 'moyennes_generales'):
+        assert np.array_equal(getattr(obtenu, attribut), getattr(attendu, attribut),
+                              equal_nan=True), attribut
+
+
+def sans_categories(df):
+    return df.astype({'Nom': str, 'Prénom': str})
+
+
+@pytest.mark.parametrize('graine', range(3))
+def test_modifications_identiques_a_un_nouveau_classement(graine):
+    rng = random.Random(graine)
+    noms = [nom_aleatoire(rng) for _ in range(5)]
+    liste_notes = [releve_aleatoire(rng) for _ in range(5)]
+    classement = ClassementPromotion(noms, liste_notes)
+    # Au-delà de 64 étudiants pour passer par l'agrandissement des tableaux
+    for _ in range(400):
+        operation = rng.random()
+        if operation < 0.6 or not noms:
+            noms.append(nom_aleatoire(rng))
+            liste_notes.append(releve_aleatoire(rng))
+            assert classement.ajouter(noms[-1], liste_notes[-1]) == len(noms) - 1
+        elif operation < 0.85:
+            i = rng.randrange(len(noms))
+            noms[i], liste_notes[i] = nom_aleatoire(rng), releve_aleatoire(rng)
+            classement.remplacer(i, noms[i], liste_notes[i])
+        else:
+            i = rng.randrange(len(noms))
+            del noms[i], liste_notes[i]
+            classement.retirer(i)
+        if rng.random() < 0.3:
+            # Rang tenu à jour par insertion entre deux modifications
+            classement.ordre()
+
+    attendu = ClassementPromotion(noms, liste_notes)
+    assert classement.noms == noms
+    memes_tableaux(classement, attendu)
+    np.testing.assert_array_equal(classement.ordre(), attendu.ordre())
+
+    reference = classer_resultats(resultats_promotion(list(zip(noms, liste_notes))))
+    np.testing.assert_array_equal(classement.ordre(), reference.index.to_numpy())
+    pd.testing.assert_frame_equal(sans_categories(classement.dataframe()),
+                                  sans_categories(reference), check_exact=True)
+
+
+def test_surveillance_apres_retraits(tmp_path):
+    # Après des retraits, chaque relevé restant doit garder sa propre ligne
+    # dans le classement (indices décalés par la surveillance)
+    dossier = str(tmp_path / 'releves')
+    chemins = [c + '.pdf' for c in generer_promotion(dossier, 10, texte=False)]
+    surveillance = SurveillanceDossier(dossier, str(tmp_path / 'classement.csv'))
+    assert surveillance.passe() == 10
+
+    for chemin in chemins[1:8:3]:
+        os.unlink(chemin)
+    with open(chemins[5], 'wb') as f:
+        f.write(pdf_releve(texte_releve(random.Random(99), densite=0.5)))
+    os.utime(chemins[5], ns=(0, 0))
+    chemins += [c + '.pdf' for c in generer_promotion(
+        str(tmp_path / 'nouveaux'), 12, texte=False, graine=1)[10:]]
+    for chemin in chemins[10:]:
+        os.replace(chemin, os.path.join(dossier, os.path.basename(chemin)))
+    assert surveillance.passe() == 6
+
+    restants = sorted(os.path.join(dossier, nom) for nom in os.listdir(dossier))
+    assert sorted(surveillance.indices) == restants
+    par_indice = sorted(restants, key=surveillance.indices.get)
+    attendu = ClassementPromotion([extraire_nom_prenom(c) for c in par_indice],
+                                  [extraire_notes_pdf(c) for c in par_indice])
+    memes_tableaux(surveillance.classement, attendu)
+    assert surveillance.classement.noms == attendu.noms
+    pd.testing.assert_frame_equal(surveillance.classement.dataframe(), attendu.dataframe())
+
+
+@pytest.mark.parametrize('graine', range(3))
+def test_changements_identiques_au_calcul_complet(graine):
+    rng = random.Random(graine)
+    liste_notes = [releve_aleatoire(rng) for _ in range(100)]
+    noms = [nom_aleatoire(rng) for _ in liste_notes]
+    classement = ClassementPromotion(noms, liste_notes)
+    coeffs = {ue: dict(matieres_coeffs) for ue, matieres_coeffs in MODELE_DEFAUT.coeffs.items()}
+    ignore_sae = True
+    for _ in range(100):
+        if rng.random() < 0.2:
+            ignore_sae = not ignore_sae
+            classement.changer_ignore_sae(ignore_sae)
+        else:
+            # Nouvelle UE de temps en temps : le tableau des UE s'élargit
+            ue = rng.choice(list(coeffs) + ['UE nouvelle', 'UE SAE'])
+            matiere = rng.choice(MATIERES)
+            coeff = rng.choice([None, 0.0, 0.5, 1.0, 3.0])
+            classement.changer_coefficient(ue, matiere, coeff)
+            coeffs.setdefault(ue, {})
+            if coeff is None:
+                coeffs[ue].pop(matiere, None)
+            else:
+                coeffs[ue][matiere] = coeff
+
+        ues, _, moyennes_ue, moyennes_generales, _ = calculer_moyennes_promotion(
+            liste_notes, ignore_sae, coeffs)
+        assert classement.ues == ues
+        assert np.array_equal(classement.moyennes_ue, moyennes_ue, equal_nan=True)
+        assert np.array_equal(classement.moyennes_generales, moyennes_generales, equal_nan=True)
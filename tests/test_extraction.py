@@ -0,0 +1,85 @@
+# La lecture en une passe (extraire_notes_from_txt) et la lecture morceau par
+# morceau (ExtracteurNotes) doivent donner les mêmes notes que la lecture
+# ligne à ligne d'origine, y compris sur du texte mal formé
+# Exemple: python -m pytest tests
+import os
+import re
+import sys
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from moteur_calcul import ExtracteurNotes, extraire_notes_from_txt
+
+# Morceaux de texte assemblés au hasard : en-têtes et codes SAE complets ou
+# tronqués, notes entières ou coupées par des retours à la ligne, notes collées
+# aux codes
+JETONS = ["Code ECUE TBFTR301", "Code ECUE TBFTR30", "Code ECUE TBFTR3021",
+          "Code ECUE TBFTR314", "TBFTE301", "TBFTE30", "TBFTE301\n",
+          "TBFTE3011,00 (coeff 1,00)", "12,50 (coeff 1,00)", "3.5(coeff 2.0)",
+          "7,25 (coeff\n0,50)", "9 (coeff 1,0)", ",5 (coeff 1,0)", "(coeff 2,00)",
+          "12,50", "(coeff", "1,00)", "\n\n(coeff ", "9,9", "1", ",", "x",
+          " ", "  ", "\n", "\n", "\n"]
+
+
+def extraire_notes_lignes(texte):
+    # Version d'origine, gardée comme référence
+    notes = {}
+    pattern = r'(\d+[.,]\d+)\s*\(coeff\s*(\d+[.,]\d+)\)'
+    matiere_pattern = r'Code ECUE TBFTR(\d{3})'
+    matiere_courante = None
+
+    for ligne in texte.split('\n'):
+        matiere_match = re.search(matiere_pattern, ligne)
+        if matiere_match:
+            num_matiere = matiere_match.group(1)
+            matiere_courante = f"R3.{int(num_matiere):02d}"
+
+        if matiere_courante:
+            for match in re.finditer(pattern, ligne):
+                note = float(match.group(1).replace(',', '.'))
+                coeff = float(match.group(2).replace(',', '.'))
+                if matiere_courante not in notes:
+                    notes[matiere_courante] = []
+                notes[matiere_courante].append((note, coeff))
+
+    sae_pattern = r'TBFTE301.*?(\d+[.,]\d+)\s*\(coeff\s*(\d+[.,]\d+)\)'
+    sae_match = re.search(sae_pattern, texte, re.DOTALL)
+    if sae_match:
+        note = float(sae_match.group(1).replace(',', '.'))
+        coeff = float(sae_match.group(2).replace(',', '.'))
+        notes['SAE3.01'] = [(note, coeff)]
+
+    return notes
+
+
+def par_morceaux(texte, coupes):
+    extracteur = ExtracteurNotes()
+    debut = 0
+    for coupe in coupes:
+        extracteur.ajouter(texte[debut:coupe])
+        debut = coupe
+    extracteur.ajouter(texte[debut:])
+    return extracteur.resultat()
+
+
+def test_identique_a_la_lecture_ligne_a_ligne():
+    rng = random.Random(0)
+    for _ in range(30000):
+        texte = "".join(rng.choice(JETONS) for _ in range(rng.randint(0, 25)))
+        coupes = sorted(rng.sample(range(len(texte) + 1),
+                                   min(len(texte) + 1, rng.randint(0, 4))))
+        attendu = extraire_notes_lignes(texte)
+        assert extraire_notes_from_txt(texte) == attendu, repr(texte)
+        assert par_morceaux(texte, coupes) == attendu, (repr(texte), coupes)
+
+
+def test_note_avant_l_en_tete_sur_la_meme_ligne():
+    # La note passe à la ressource de l'en-tête, seul le premier en-tête compte
+    texte = "Code ECUE TBFTR301\n12,00 (coeff 1,00) Code ECUE TBFTR302 Code ECUE TBFTR303\n"
+    assert extraire_notes_from_txt(texte) == {'R3.302': [(12.0, 1.0)]}
+
+
+def test_note_de_sae_a_cheval_sur_deux_morceaux():
+    texte = "TBFTE301\n\n14,50\n(coeff\n2,00)\n"
+    for coupe in range(len(texte) + 1):
+        assert par_morceaux(texte, [coupe]) == {'SAE3.01': [(14.5, 2.0)]}, coupe
@@ -0,0 +1,76 @@
+# Le calcul vectorisé de la promotion doit donner, au bit près, les mêmes
+# moyennes que le calcul étudiant par étudiant
+# Exemple: python -m pytest tests
+import os
+import sys
+import random
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from matieres_coeffs import MODELE_DEFAUT
+from moteur_calcul import (calculer_moyennes_etudiant, calculer_moyennes_promotion,
+                           moyennes_par_etudiant)
+
+# Clés telles que les donne l'extracteur : R3.301 à R3.314 et la SAE
+CLES = sorted(MODELE_DEFAUT.matiere_de_cle)
+VALEURS_NOTES = [0.0, 0.45, 5.1, 10.0, 12.5, 13.33, 17.75, 20.0]
+VALEURS_COEFFS = [0.0, 0.5, 1.0, 1.5, 2.0, 3.0]
+
+
+def releve_aleatoire(rng, densite):
+    # Ressources absentes selon densite, ressource présente sans note ou avec
+    # seulement des coefficients nuls, SAE présente ou non
+    notes = {}
+    for cle in CLES:
+        if rng.random() > densite:
+            continue
+        notes[cle] = [(rng.choice(VALEURS_NOTES) + rng.randrange(100) / 100,
+                       rng.choice(VALEURS_COEFFS)) for _ in range(rng.randrange(4))]
+    if rng.random() < 0.1:
+        notes['R3.399'] = [(10.0, 1.0)]  # ressource hors modèle, ignorée
+    return notes
+
+
+def promotion_aleatoire(nb, graine):
+    rng = random.Random(graine)
+    releves = [releve_aleatoire(rng, rng.choice([0.0, 0.3, 0.9, 1.0])) for _ in range(nb)]
+    return releves + [{}, {'SAE3.01': [(15.0, 1.0)]}, {'R3.301': []}]
+
+
+def comparer(liste_notes, ignore_sae, coeffs=None):
+    promotion = calculer_moyennes_promotion(liste_notes, ignore_sae, coeffs)
+    for notes, obtenu in zip(liste_notes, moyennes_par_etudiant(*promotion), strict=True):
+        # Égalité exacte, sans tolérance
+        assert obtenu == calculer_moyennes_etudiant(notes, ignore_sae, coeffs)
+
+
+@pytest.mark.parametrize('ignore_sae', [True, False])
+def test_promotion_identique_au_calcul_par_etudiant(ignore_sae):
+    comparer(promotion_aleatoire(3000, graine=0), ignore_sae)
+
+
+@pytest.mark.parametrize('ignore_sae', [True, False])
+def test_coefficients_modifies(ignore_sae):
+    # UE vide et UE réduite à la SAE : moyennes None / NaN
+    coeffs = {ue: dict(matieres_coeffs) for ue, matieres_coeffs in MODELE_DEFAUT.coeffs.items()}
+    coeffs['UE vide'] = {}
+    coeffs['UE SAE'] = {MODELE_DEFAUT.sae: 1.0}
+    comparer(promotion_aleatoire(200, graine=1), ignore_sae, coeffs)
+
+
+def test_promotion_vide():
+    ues, matieres, moyennes_ue, moyennes_generales, moyennes_ressources = \
+        calculer_moyennes_promotion([])
+    assert moyennes_ue.shape == (0, len(ues))
+    assert moyennes_ressources.shape == (0, len(matieres))
+    assert moyennes_generales.shape == (0,)
+
+
+def test_releves_sans_note():
+    _, _, moyennes_ue, moyennes_generales, moyennes_ressources = \
+        calculer_moyennes_promotion([{}, {'R3.301': []}, {'R3.301': [(12.0, 0.0)]}])
+    assert np.isnan(moyennes_ue).all()
+    assert np.isnan(moyennes_generales).all()
+    assert np.isnan(moyennes_ressources).all()
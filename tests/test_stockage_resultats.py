@@ -0,0 +1,31 @@
+# Stockage en colonnes des résultats d'une promotion
+# Exemple: python -m pytest tests
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from moteur_calcul import calculer_moyennes_promotion
+from stockage_resultats import ResultatsPromotion
+
+
+def test_bloc_vide():
+    # Lot dont tous les relevés sont en erreur
+    ues, matieres, *moyennes = calculer_moyennes_promotion([])
+    resultats = ResultatsPromotion(0, ues, matieres)
+    resultats.ajouter_bloc([], ues, matieres, *moyennes)
+    assert len(resultats) == 0
+    assert len(resultats.dataframe()) == 0
+
+
+def test_capacite_depassee():
+    ues, matieres, *moyennes = calculer_moyennes_promotion(
+        [{'R3.301': [(12.0, 1.0)]}, {}, {'R3.302': [(8.0, 2.0)]}])
+    noms = [{'nom': f'NOM{i}', 'prenom': 'PRENOM'} for i in range(3)]
+    resultats = ResultatsPromotion(0, ues, matieres)
+    resultats.ajouter_bloc(noms[:1], ues, matieres, *(m[:1] for m in moyennes))
+    resultats.ajouter_bloc(noms[1:], ues, matieres, *(m[1:] for m in moyennes))
+    df = resultats.vue()
+    assert list(df['Nom']) == ['NOM0', 'NOM1', 'NOM2']
+    np.testing.assert_array_equal(df['Moyenne générale'].to_numpy(), moyennes[1])